@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the analysis pipeline, run offline against synthetic leagues
+
+Cases (each run for every league size and season length):
+    weekly     - analyze_weekly_performance for every team and week
+    season     - analyze_season_performance for one manager
+    analyze    - POST /analyze end to end against the fake Sleeper API, cold caches
+    serialize  - JSON encoding of the /analyze response (full and compact formats)
+
+Latency, throughput and peak memory are written to a results file. Passing
+--baseline compares against an earlier results file and exits non-zero when
+any case is slower (or uses more memory) than the baseline by more than
+--threshold.
+
+    python benchmark.py --output baseline.json
+    python benchmark.py --baseline baseline.json --threshold 0.2
+"""
+
+import argparse
+import gc
+import json
+import logging
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from fastapi.testclient import TestClient
+
+import main
+from fake_sleeper import FakeSleeper, generate_league
+
+def measure(fn: Callable[[], int], repeat: int) -> Dict:
+    """Time `fn` `repeat` times (it returns how many operations it ran) and trace its peak memory once"""
+    fn()  # warm up imports, memo tables and the allocator
+
+    timings, ops = [], 0
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        ops += fn()
+        timings.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        'repeat': repeat,
+        'mean_ms': round(statistics.mean(timings) * 1000, 3),
+        'p50_ms': round(statistics.median(timings) * 1000, 3),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000, 3),
+        'ops_per_sec': round(ops / sum(timings), 2),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+def weekly_inputs(league) -> List[tuple]:
+    """(roster, matchup, player_stats) for every team and week, with rosters taken from the matchups"""
+    owners = {roster['roster_id']: roster['owner_id'] for roster in league.rosters}
+    inputs = []
+    for week, matchups in league.matchups.items():
+        for matchup in matchups:
+            roster = {'roster_id': matchup['roster_id'], 'owner_id': owners[matchup['roster_id']],
+                      'players': matchup['players'], 'starters': matchup['starters']}
+            inputs.append((roster, matchup, league.stats[week]))
+    return inputs
+
+def season_inputs(league) -> tuple:
+    weeks = sorted(league.matchups)
+    all_matchups = [league.matchups[week] for week in weeks]
+    all_rosters = main.build_roster_history(league.rosters, all_matchups)
+    # Stats projected to rostered players and scoring fields, as ingestion does
+    fields = main.league_stat_fields(league.league)
+    all_player_stats = [
+        main.WeekStats.from_payload(league.stats[week]).project(
+            {player_id for roster in week_rosters for player_id in roster['players']}, fields)
+        for week, week_rosters in zip(weeks, all_rosters)
+    ]
+    return all_matchups, all_rosters, all_player_stats
+
+def run_analyze(client: TestClient, league_id: str) -> Dict:
+    """POST /analyze with empty caches so every run ingests and analyzes the whole season"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        main.player_db = main.PlayerDatabase(cache_dir=cache_dir)
+        main.stats_cache = main.PlayerStatsCache(cache_dir=cache_dir)
+        main.league_cache = main.LeagueAnalysisCache()
+        main.history_store = main.HistoryStore(path=f"{cache_dir}/history.sqlite3")
+        response = client.post("/analyze", data={"league_id": league_id, "refresh": "true"})
+        main.history_store.close()
+    response.raise_for_status()
+    return response.json()
+
+def bench_league(teams: int, weeks: int, players: int, repeat: int, seed: int) -> Dict[str, Dict]:
+    league = generate_league(teams=teams, weeks=weeks, player_pool=players, seed=seed)
+    context = main.LeagueContext.from_league(league.league, main.PlayerDatabase.project(league.players))
+    analytics = main.FantasyAnalytics()
+    results = {}
+
+    inputs = weekly_inputs(league)
+    def weekly():
+        for roster, matchup, stats in inputs:
+            analytics.analyze_weekly_performance(context, roster, matchup, stats)
+        return len(inputs)
+    results['weekly'] = measure(weekly, repeat)
+
+    all_matchups, all_rosters, all_player_stats = season_inputs(league)
+    user_id = league.users[0]['user_id']
+    def season():
+        analytics.analyze_season_performance(context, user_id, all_matchups, all_rosters, all_player_stats)
+        return 1
+    results['season'] = measure(season, repeat)
+
+    # No rate limit: measure the pipeline, not the upstream throttle
+    fake = FakeSleeper([league])
+    main.analytics.sleeper_api = main.SleeperAPI(base_url=FakeSleeper.BASE_URL, client=fake.client(),
+                                                 rate_limiter=main.TokenBucket(rate_per_minute=10**9, burst=10**6))
+    with TestClient(main.app) as client:
+        payload = run_analyze(client, league.league_id)
+        results['analyze'] = measure(lambda: run_analyze(client, league.league_id) and 1, repeat)
+
+    def serialize():
+        main.dumps_json(payload)
+        return 1
+    results['serialize'] = measure(serialize, repeat)
+    results['serialize']['bytes'] = len(main.dumps_json(payload))
+
+    def serialize_compact():
+        main.dumps_json(main.compact_analysis(payload))
+        return 1
+    results['serialize_compact'] = measure(serialize_compact, repeat)
+    results['serialize_compact']['bytes'] = len(main.dumps_json(main.compact_analysis(payload)))
+    return results
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Cases whose mean latency or peak memory grew by more than `threshold` over the baseline"""
+    regressions = []
+    for name, case in results['cases'].items():
+        before = baseline.get('cases', {}).get(name)
+        if not before:
+            continue
+        for metric in ('mean_ms', 'peak_kb'):
+            if before[metric] and case[metric] > before[metric] * (1 + threshold):
+                regressions.append(f"{name} {metric}: {before[metric]} -> {case[metric]} "
+                                   f"(+{(case[metric] / before[metric] - 1) * 100:.0f}%)")
+    return regressions
+
+def parse_ints(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part]
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the league analysis pipeline")
+    parser.add_argument("--teams", type=parse_ints, default=[10, 14], help="comma-separated league sizes")
+    parser.add_argument("--weeks", type=parse_ints, default=[14, 17], help="comma-separated season lengths")
+    parser.add_argument("--players", type=int, default=2000, help="player database size")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json", help="results file to write")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed relative slowdown or memory growth before failing")
+    args = parser.parse_args()
+
+    main.logger.setLevel(logging.WARNING)
+    results = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'executor': main.analysis_executor.mode,
+        'cases': {},
+    }
+    for teams in args.teams:
+        for weeks in args.weeks:
+            for case, stats in bench_league(teams, weeks, args.players, args.repeat, args.seed).items():
+                name = f"{case}[teams={teams},weeks={weeks}]"
+                results['cases'][name] = stats
+                print(f"{name:<36} mean {stats['mean_ms']:>10.3f} ms  p95 {stats['p95_ms']:>10.3f} ms  "
+                      f"{stats['ops_per_sec']:>10.1f} ops/s  peak {stats['peak_kb']:>9.1f} KiB")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"❌ Regressions over {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"✅ No regressions over {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Shared fixtures for the offline tests against the fake Sleeper API
+"""
+
+import pytest
+
+import main
+from fake_sleeper import FakeSleeper
+
+class OfflineApp:
+    """Points the app's globals at a FakeSleeper, with caches under a temporary directory"""
+
+    def __init__(self, monkeypatch, cache_dir):
+        self.monkeypatch = monkeypatch
+        self.cache_dir = cache_dir
+        self.fake = None
+
+    def serve(self, leagues, **queue_options) -> FakeSleeper:
+        """Serve `leagues` from a fake Sleeper API with empty caches and a fresh job queue"""
+        self.fake = FakeSleeper(leagues)
+        self.restart(**queue_options)
+        return self.fake
+
+    def restart(self, **queue_options):
+        """A new process: fresh client and in-memory caches, same files on disk"""
+        patch = self.monkeypatch.setattr
+        patch(main.analytics, "sleeper_api", main.SleeperAPI(base_url=FakeSleeper.BASE_URL,
+                                                             client=self.fake.client()))
+        patch(main, "player_db", main.PlayerDatabase(cache_dir=str(self.cache_dir)))
+        patch(main, "stats_cache", main.PlayerStatsCache(cache_dir=str(self.cache_dir)))
+        patch(main, "league_cache", main.LeagueAnalysisCache())
+        patch(main, "league_info_cache", main.PayloadCache())
+        patch(main, "history_store", main.HistoryStore(path=str(self.cache_dir / "history.sqlite3")))
+        patch(main, "job_queue", main.AnalysisJobQueue(main.job_queue.runner, **queue_options))
+
+@pytest.fixture
+def offline(monkeypatch, tmp_path):
+    """Call `offline.serve([league, ...])` to run the app against synthetic leagues"""
+    return OfflineApp(monkeypatch, tmp_path)
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Sleeper API backed by synthetic leagues
+
+Serves the Sleeper endpoints the app uses (league, users, rosters, matchups,
+weekly stats, players and user leagues) from generated data, so the whole
+pipeline can be tested and benchmarked without network access.
+
+Run it as a server and point the app at it:
+    python fake_sleeper.py --teams 12 --weeks 14 --port 8001
+    SLEEPER_BASE_URL=http://localhost:8001/v1 python main.py
+
+Or plug it straight into SleeperAPI in-process:
+    fake = FakeSleeper([generate_league()])
+    api = SleeperAPI(base_url=FakeSleeper.BASE_URL, client=fake.client())
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from typing import Dict, List, Optional
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+
+from main import NON_STARTING_SLOTS, SLOT_ELIGIBILITY
+
+DEFAULT_ROSTER_POSITIONS = ['QB', 'RB', 'RB', 'WR', 'WR', 'TE', 'FLEX', 'K', 'DEF'] + ['BN'] * 6
+
+# Sleeper-style scoring weights per stat (full PPR)
+DEFAULT_SCORING_SETTINGS = {
+    'pass_yd': 0.04, 'pass_td': 4.0, 'pass_int': -1.0,
+    'rush_yd': 0.1, 'rush_td': 6.0,
+    'rec': 1.0, 'rec_yd': 0.1, 'rec_td': 6.0,
+    'fum_lost': -2.0,
+    'fgm': 3.0, 'xpm': 1.0,
+    'def_sack': 1.0, 'def_int': 2.0, 'def_fum_rec': 2.0, 'def_td': 6.0,
+    'idp_tkl_solo': 1.0, 'idp_sack': 2.0, 'idp_int': 3.0,
+}
+
+# Weekly stat line generators by position: stat -> (kind, mean, spread)
+STAT_PROFILES = {
+    'QB': {'pass_yd': ('normal', 235, 65), 'pass_td': ('poisson', 1.6), 'pass_int': ('poisson', 0.8),
+           'rush_yd': ('normal', 14, 12), 'rush_td': ('poisson', 0.15), 'fum_lost': ('poisson', 0.1)},
+    'RB': {'rush_yd': ('normal', 55, 30), 'rush_td': ('poisson', 0.4), 'rec': ('poisson', 2.5),
+           'rec_yd': ('normal', 18, 14), 'rec_td': ('poisson', 0.1), 'fum_lost': ('poisson', 0.08)},
+    'WR': {'rec': ('poisson', 4.5), 'rec_yd': ('normal', 55, 32), 'rec_td': ('poisson', 0.35),
+           'rush_yd': ('normal', 2, 4)},
+    'TE': {'rec': ('poisson', 3.5), 'rec_yd': ('normal', 36, 22), 'rec_td': ('poisson', 0.25)},
+    'K': {'fgm': ('poisson', 1.6), 'xpm': ('poisson', 2.2)},
+    'DEF': {'def_sack': ('poisson', 2.3), 'def_int': ('poisson', 0.8), 'def_fum_rec': ('poisson', 0.6),
+            'def_td': ('poisson', 0.15)},
+    'DL': {'idp_tkl_solo': ('poisson', 2.5), 'idp_sack': ('poisson', 0.45)},
+    'LB': {'idp_tkl_solo': ('poisson', 4.5), 'idp_sack': ('poisson', 0.2), 'idp_int': ('poisson', 0.05)},
+    'DB': {'idp_tkl_solo': ('poisson', 3.5), 'idp_int': ('poisson', 0.12)},
+}
+
+# Positions drafted onto benches, weighted like a typical redraft roster
+BENCH_POSITIONS = ['RB', 'RB', 'WR', 'WR', 'QB', 'TE']
+
+def score(stats: Dict[str, float], scoring_settings: Dict[str, float]) -> float:
+    """Fantasy points of a stat line under Sleeper-style scoring settings"""
+    return round(sum(value * scoring_settings.get(stat, 0) for stat, value in stats.items()), 2)
+
+def _poisson(rng: random.Random, mean: float) -> int:
+    # Knuth's method; means here are small
+    limit, k, p = pow(2.718281828459045, -mean), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+def _stat_line(rng: random.Random, position: str, talent: float) -> Dict[str, float]:
+    stats = {'gp': 1}
+    for stat, profile in STAT_PROFILES[position].items():
+        if profile[0] == 'poisson':
+            stats[stat] = _poisson(rng, profile[1] * talent)
+        else:
+            stats[stat] = max(0, round(rng.gauss(profile[1] * talent, profile[2])))
+    return stats
+
+def _eligible_positions(slot: str) -> List[str]:
+    return sorted(SLOT_ELIGIBILITY.get(slot, {slot}))
+
+def _round_robin(roster_ids: List[int], week: int) -> List[tuple]:
+    """Pairings for a week using the circle method (a bye team sits out if odd)"""
+    teams = list(roster_ids) + ([None] if len(roster_ids) % 2 else [])
+    rotation = (week - 1) % (len(teams) - 1)
+    rest = teams[1:]
+    rest = rest[-rotation:] + rest[:-rotation] if rotation else rest
+    order = [teams[0]] + rest
+    half = len(order) // 2
+    return [(order[i], order[-1 - i]) for i in range(half)]
+
+class SyntheticLeague:
+    """A generated league with everything the Sleeper endpoints return"""
+
+    def __init__(self, league: Dict, users: List[Dict], rosters: List[Dict],
+                 matchups: Dict[int, List[Dict]], stats: Dict[int, Dict[str, Dict]], players: Dict[str, Dict]):
+        self.league = league
+        self.users = users
+        self.rosters = rosters
+        self.matchups = matchups
+        self.stats = stats
+        self.players = players
+
+    @property
+    def league_id(self) -> str:
+        return self.league['league_id']
+
+    @property
+    def season(self) -> str:
+        return self.league['season']
+
+def generate_league(teams: int = 12, weeks: int = 14, roster_positions: Optional[List[str]] = None,
+                    player_pool: Optional[int] = None, season: str = "2023", seed: int = 0,
+                    league_id: Optional[str] = None, scoring_settings: Optional[Dict[str, float]] = None,
+                    previous_league_id: Optional[str] = None, user_ids: Optional[List[str]] = None,
+                    waiver_rate: float = 0.25) -> SyntheticLeague:
+    """Generate a league with `teams` rosters and `weeks` completed weeks.
+
+    Player stats are drawn per position with a per-player talent factor, and
+    managers set lineups from noisy projections, so some bench players outscore
+    starters. Each week after the first, every team swaps a player for a new one
+    of the same position with probability `waiver_rate`, so rosters change over
+    the season like real ones. `player_pool` adds free agents until the player
+    database has at least that many players.
+    """
+    rng = random.Random(seed)
+    roster_positions = list(roster_positions or DEFAULT_ROSTER_POSITIONS)
+    scoring_settings = dict(scoring_settings or DEFAULT_SCORING_SETTINGS)
+    league_id = league_id or str(1_000_000_000_000_000_000 + seed)
+
+    players: Dict[str, Dict] = {}
+    talent: Dict[str, float] = {}
+
+    def new_player(position: str) -> str:
+        player_id = str(1000 + len(players)) if position != 'DEF' else f"DEF{len(players)}"
+        players[player_id] = {
+            'player_id': player_id,
+            'first_name': f"{position}{len(players)}",
+            'last_name': rng.choice(['Smith', 'Johnson', 'Brown', 'Jones', 'Miller', 'Davis', 'Moore']),
+            'position': position,
+            'fantasy_positions': [position],
+            'team': rng.choice(['BUF', 'KC', 'PHI', 'SF', 'DAL', 'MIA', 'DET', 'BAL']),
+            'status': 'Active',
+        }
+        talent[player_id] = rng.uniform(0.6, 1.4)
+        return player_id
+
+    starting_slots = [slot for slot in roster_positions if slot not in NON_STARTING_SLOTS]
+    bench_size = len(roster_positions) - len(starting_slots)
+
+    user_ids = list(user_ids or [str(900_000 + seed * 1000 + i) for i in range(1, teams + 1)])
+    users = [{'user_id': user_ids[i - 1], 'display_name': f"Manager {i}",
+              'metadata': {'team_name': f"Team {i}"}, 'is_owner': i == 1} for i in range(1, teams + 1)]
+    rosters = []
+    for roster_id in range(1, teams + 1):
+        roster_players = [new_player(rng.choice(_eligible_positions(slot))) for slot in starting_slots]
+        roster_players += [new_player(rng.choice(BENCH_POSITIONS)) for _ in range(bench_size)]
+        rosters.append({'roster_id': roster_id, 'owner_id': user_ids[roster_id - 1],
+                        'players': roster_players, 'starters': [], 'settings': {}})
+
+    while player_pool and len(players) < player_pool:
+        new_player(rng.choice(list(STAT_PROFILES)))
+
+    stats: Dict[int, Dict[str, Dict]] = {}
+    matchups: Dict[int, List[Dict]] = {}
+    for week in range(1, weeks + 1):
+        for roster in rosters:
+            if week > 1 and rng.random() < waiver_rate:
+                dropped = rng.randrange(len(roster['players']))
+                roster['players'] = list(roster['players'])
+                roster['players'][dropped] = new_player(players[roster['players'][dropped]]['position'])
+
+        week_stats = {}
+        for player_id, player in players.items():
+            line = _stat_line(rng, player['position'], talent[player_id])
+            line['pts_std'] = score(line, {**DEFAULT_SCORING_SETTINGS, 'rec': 0.0})
+            line['pts_half_ppr'] = score(line, {**DEFAULT_SCORING_SETTINGS, 'rec': 0.5})
+            line['pts_ppr'] = score(line, {**DEFAULT_SCORING_SETTINGS, 'rec': 1.0})
+            week_stats[player_id] = line
+        stats[week] = week_stats
+
+        week_matchups = []
+        for roster in rosters:
+            points = {pid: score(week_stats[pid], scoring_settings) for pid in roster['players']}
+            starters = _set_lineup(rng, starting_slots, roster['players'], players, talent)
+            starters_points = [points.get(pid, 0.0) for pid in starters]
+            week_matchups.append({
+                'roster_id': roster['roster_id'],
+                'matchup_id': None,
+                'points': round(sum(starters_points), 2),
+                'starters': starters,
+                'starters_points': starters_points,
+                'players': list(roster['players']),
+                'players_points': points,
+            })
+            roster['starters'] = starters
+        for matchup_id, (home, away) in enumerate(_round_robin([r['roster_id'] for r in rosters], week), 1):
+            for matchup in week_matchups:
+                if matchup['roster_id'] in (home, away):
+                    matchup['matchup_id'] = matchup_id
+        matchups[week] = week_matchups
+
+    league = {
+        'league_id': league_id,
+        'name': f"Synthetic League {seed}",
+        'season': str(season),
+        'sport': 'nfl',
+        'status': 'in_season',
+        'total_rosters': teams,
+        'roster_positions': roster_positions,
+        'scoring_settings': scoring_settings,
+        'settings': {'leg': weeks, 'num_teams': teams, 'playoff_week_start': 15, 'playoff_teams': 6},
+        'previous_league_id': previous_league_id,
+    }
+    return SyntheticLeague(league, users, rosters, matchups, stats, players)
+
+def _set_lineup(rng: random.Random, slots: List[str], roster_players: List[str],
+                players: Dict[str, Dict], talent: Dict[str, float]) -> List[str]:
+    """Fill slots (most restrictive first) from noisy projections, like a real manager"""
+    projection = {pid: talent[pid] * rng.uniform(0.5, 1.5) for pid in roster_players}
+    order = sorted(range(len(slots)), key=lambda i: len(SLOT_ELIGIBILITY.get(slots[i], ())))
+    starters = ['0'] * len(slots)
+    available = set(roster_players)
+    for i in order:
+        eligible = [pid for pid in available if players[pid]['position'] in SLOT_ELIGIBILITY.get(slots[i], {slots[i]})]
+        if eligible:
+            choice = max(eligible, key=lambda pid: projection[pid])
+            starters[i] = choice
+            available.discard(choice)
+    return starters
+
+class FakeSleeper:
+    """ASGI app serving synthetic leagues under Sleeper's /v1 routes.
+
+    `latency` adds a delay to every response and `error_rate` answers that
+    fraction of requests with 429, to exercise timeouts, retries and backoff.
+    """
+
+    BASE_URL = "http://fake-sleeper/v1"
+
+    def __init__(self, leagues: List[SyntheticLeague], latency: float = 0.0,
+                 error_rate: float = 0.0, seed: int = 0):
+        self.leagues = {league.league_id: league for league in leagues}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests: List[str] = []
+        self._encoded: Dict[tuple, bytes] = {}
+        self._rng = random.Random(seed)
+        self.app = self._build_app()
+
+    def add_league(self, league: SyntheticLeague):
+        self.leagues[league.league_id] = league
+        self._encoded.clear()
+
+    def _json(self, key: tuple, build) -> Response:
+        # Payloads never change, so encode each once; keeps the fake's own cost out of benchmarks
+        if key not in self._encoded:
+            self._encoded[key] = json.dumps(build()).encode()
+        return Response(self._encoded[key], media_type="application/json")
+
+    def _league(self, league_id: str) -> SyntheticLeague:
+        if league_id not in self.leagues:
+            raise HTTPException(status_code=404, detail="League not found")
+        return self.leagues[league_id]
+
+    def _stats(self, season: str, week: int) -> Dict:
+        # Stats are league independent; serve them from any league in the season
+        for league in self.leagues.values():
+            if league.season == season and week in league.stats:
+                return league.stats[week]
+        return {}
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Fake Sleeper API")
+
+        @app.middleware("http")
+        async def simulate_network(request: Request, call_next):
+            self.requests.append(request.url.path)
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if self.error_rate and self._rng.random() < self.error_rate:
+                return JSONResponse({'error': 'rate limited'}, status_code=429)
+            return await call_next(request)
+
+        @app.get("/v1/league/{league_id}")
+        async def league(league_id: str):
+            return self._json(('league', league_id), lambda: self._league(league_id).league)
+
+        @app.get("/v1/league/{league_id}/users")
+        async def users(league_id: str):
+            return self._json(('users', league_id), lambda: self._league(league_id).users)
+
+        @app.get("/v1/league/{league_id}/rosters")
+        async def rosters(league_id: str):
+            return self._json(('rosters', league_id), lambda: self._league(league_id).rosters)
+
+        @app.get("/v1/league/{league_id}/matchups/{week}")
+        async def matchups(league_id: str, week: int):
+            return self._json(('matchups', league_id, week), lambda: self._league(league_id).matchups.get(week, []))
+
+        @app.get("/v1/stats/nfl/regular/{season}/{week}")
+        async def stats(season: str, week: int):
+            return self._json(('stats', season, week), lambda: self._stats(season, week))
+
+        @app.get("/v1/players/nfl")
+        async def players():
+            def merged():
+                players = {}
+                for league in self.leagues.values():
+                    players.update(league.players)
+                return players
+            return self._json(('players',), merged)
+
+        @app.get("/v1/user/{user_id}/leagues/nfl/{season}")
+        async def user_leagues(user_id: str, season: str):
+            return [league.league for league in self.leagues.values()
+                    if league.season == season and any(u['user_id'] == user_id for u in league.users)]
+
+        return app
+
+    def transport(self) -> httpx.ASGITransport:
+        return httpx.ASGITransport(app=self.app)
+
+    def client(self) -> httpx.AsyncClient:
+        """An httpx client that answers requests in-process, for SleeperAPI(client=...)"""
+        return httpx.AsyncClient(transport=self.transport())
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic leagues with the Sleeper API's routes")
+    parser.add_argument("--leagues", type=int, default=1, help="number of leagues to generate")
+    parser.add_argument("--teams", type=int, default=12)
+    parser.add_argument("--weeks", type=int, default=14)
+    parser.add_argument("--players", type=int, default=2000, help="minimum player database size")
+    parser.add_argument("--roster", default=",".join(DEFAULT_ROSTER_POSITIONS),
+                        help="comma-separated roster_positions")
+    parser.add_argument("--season", default="2023")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+
+    leagues = [generate_league(teams=args.teams, weeks=args.weeks, roster_positions=args.roster.split(","),
+                               player_pool=args.players, season=args.season, seed=args.seed + i)
+               for i in range(args.leagues)]
+    fake = FakeSleeper(leagues, latency=args.latency, error_rate=args.error_rate, seed=args.seed)
+
+    print("Synthetic leagues:")
+    for league in leagues:
+        print(f"  {league.league_id} ({args.teams} teams, {args.weeks} weeks)")
+    print(f"Start the app with: SLEEPER_BASE_URL=http://localhost:{args.port}/v1 python main.py")
+
+    import uvicorn
+    uvicorn.run(fake.app, host="0.0.0.0", port=args.port)
+
+if __name__ == "__main__":
+    main()
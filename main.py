@@ -1,178 +1,1417 @@
 from fastapi import FastAPI, HTTPException, Request, Form
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
 import httpx
 import asyncio
-from typing import Dict, List, Optional
+import hashlib
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
 import json
+import warnings
 from datetime import datetime
-import pandas as pd
 import numpy as np
 
-app = FastAPI(title="Fantasy Football Analytics", version="1.0.0")
+try:
+    import orjson  # optional, faster JSON encoding
+except ImportError:
+    orjson = None
+try:
+    import brotli  # optional, enables the br Content-Encoding
+except ImportError:
+    brotli = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared Sleeper HTTP client and job workers on startup, close them on shutdown"""
+    await analytics.sleeper_api.start()
+    player_db.load()
+    job_queue.start()
+    yield
+    await job_queue.stop()
+    analysis_executor.shutdown()
+    history_store.close()
+    await analytics.sleeper_api.close()
+
+app = FastAPI(title="Fantasy Football Analytics", version="1.0.0", lifespan=lifespan)
 
 # Mount static files and templates
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
+# Logging settings
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()  # "text" or "json"
+# Fraction of DEBUG records that are emitted (INFO and above are never sampled)
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+
+# Per-request logging context (request_id, league_id), inherited by tasks
+log_context: ContextVar[Dict[str, str]] = ContextVar("log_context", default={})
+
+def set_log_context(**fields: str):
+    """Add fields to the logging context of the current request"""
+    log_context.set({**log_context.get(), **fields})
+
+class _ContextFilter(logging.Filter):
+    """Attach the request context to every record and sample DEBUG records"""
+    
+    def __init__(self, debug_sample_rate: float):
+        super().__init__()
+        self.debug_sample_rate = debug_sample_rate
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno <= logging.DEBUG and self.debug_sample_rate < 1.0:
+            if random.random() >= self.debug_sample_rate:
+                return False
+        context = log_context.get()
+        record.request_id = context.get('request_id', '-')
+        record.league_id = context.get('league_id', '-')
+        return True
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': record.request_id,
+            'league_id': record.league_id,
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+def configure_logging() -> logging.Logger:
+    """Configure the app logger from the LOG_* settings"""
+    app_logger = logging.getLogger("ff")
+    app_logger.setLevel(LOG_LEVEL)
+    app_logger.propagate = False
+    if not app_logger.handlers:
+        handler = logging.StreamHandler()
+        handler.addFilter(_ContextFilter(LOG_DEBUG_SAMPLE_RATE))
+        if LOG_FORMAT == "json":
+            handler.setFormatter(_JsonFormatter())
+        else:
+            handler.setFormatter(logging.Formatter(
+                "%(asctime)s %(levelname)s %(name)s [request=%(request_id)s league=%(league_id)s] %(message)s"
+            ))
+        app_logger.addHandler(handler)
+    return app_logger
+
+logger = configure_logging()
+
+class Counter:
+    """Monotonic counter with labels, rendered in Prometheus text format"""
+    
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, rendered in Prometheus text format"""
+    
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    
+    def __init__(self, name: str, help_text: str, buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # labels -> [bucket counts..., sum, count]
+        self._values: Dict[tuple, List[float]] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._values.setdefault(key, [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+    
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration of a block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_format_labels(key + (('le', str(bound)),))} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', '+Inf'),))} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series[-1]}")
+        return lines
+
+def _format_labels(key: tuple) -> str:
+    if not key:
+        return ""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for _, value in key)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(key, escaped)) + "}"
+
+class MetricsRegistry:
+    """Process-wide registry exposed on /metrics"""
+    
+    def __init__(self):
+        self._metrics = []
+    
+    def counter(self, name: str, help_text: str) -> Counter:
+        metric = Counter(name, help_text)
+        self._metrics.append(metric)
+        return metric
+    
+    def histogram(self, name: str, help_text: str, buckets: tuple = Histogram.DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, buckets)
+        self._metrics.append(metric)
+        return metric
+    
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+SLEEPER_REQUEST_SECONDS = metrics.histogram(
+    "sleeper_request_duration_seconds", "Latency of Sleeper API requests by endpoint")
+SLEEPER_RESPONSES = metrics.counter(
+    "sleeper_responses_total", "Sleeper API responses by endpoint and status code")
+SLEEPER_RESPONSE_BYTES = metrics.counter(
+    "sleeper_response_bytes_total", "Bytes received from the Sleeper API by endpoint")
+CACHE_REQUESTS = metrics.counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit or miss)")
+STAGE_SECONDS = metrics.histogram(
+    "analysis_stage_duration_seconds", "Time spent in each /analyze stage")
+WEEK_ANALYSIS_SECONDS = metrics.histogram(
+    "week_analysis_duration_seconds", "Compute time to analyze one week for every manager",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1))
+SLEEPER_RETRIES = metrics.counter(
+    "sleeper_retries_total", "Sleeper API requests retried by endpoint")
+SLEEPER_CIRCUIT_OPENED = metrics.counter(
+    "sleeper_circuit_opened_total", "Times the Sleeper circuit breaker opened")
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "http_request_duration_seconds", "Latency of requests served by this app by route")
+
 # Sleeper API base URL
-SLEEPER_BASE_URL = "https://api.sleeper.app/v1"
+SLEEPER_BASE_URL = os.getenv("SLEEPER_BASE_URL", "https://api.sleeper.app/v1")
+
+# HTTP client settings (connection pool, keep-alive and timeouts)
+SLEEPER_HTTP2 = os.getenv("SLEEPER_HTTP2", "false").lower() in ("1", "true", "yes")
+SLEEPER_TIMEOUT = float(os.getenv("SLEEPER_TIMEOUT", "15"))
+SLEEPER_CONNECT_TIMEOUT = float(os.getenv("SLEEPER_CONNECT_TIMEOUT", "5"))
+SLEEPER_MAX_CONNECTIONS = int(os.getenv("SLEEPER_MAX_CONNECTIONS", "50"))
+SLEEPER_MAX_KEEPALIVE = int(os.getenv("SLEEPER_MAX_KEEPALIVE", "20"))
+SLEEPER_KEEPALIVE_EXPIRY = float(os.getenv("SLEEPER_KEEPALIVE_EXPIRY", "30"))
+
+# Client-side rate limit (Sleeper allows roughly 1000 requests per minute per IP)
+SLEEPER_RATE_LIMIT = float(os.getenv("SLEEPER_RATE_LIMIT", "900"))  # requests per minute
+SLEEPER_RATE_BURST = int(os.getenv("SLEEPER_RATE_BURST", "50"))
+# Retries with jittered exponential backoff on 429, 5xx and network errors
+SLEEPER_MAX_RETRIES = int(os.getenv("SLEEPER_MAX_RETRIES", "3"))
+SLEEPER_BACKOFF_BASE = float(os.getenv("SLEEPER_BACKOFF_BASE", "0.5"))
+SLEEPER_BACKOFF_MAX = float(os.getenv("SLEEPER_BACKOFF_MAX", "8"))
+# Consecutive failed requests before calls fail fast, and for how long
+SLEEPER_BREAKER_THRESHOLD = int(os.getenv("SLEEPER_BREAKER_THRESHOLD", "5"))
+SLEEPER_BREAKER_COOLDOWN = float(os.getenv("SLEEPER_BREAKER_COOLDOWN", "30"))
+
+# Maximum number of Sleeper requests in flight while ingesting a season
+INGEST_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", "8"))
+
+# Local cache settings
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+# Sleeper asks clients to download /players/nfl at most once a day
+PLAYERS_CACHE_TTL = float(os.getenv("PLAYERS_CACHE_TTL", str(24 * 60 * 60)))
+# Stats for the in-progress week are refetched after this many seconds;
+# completed weeks never change and are cached indefinitely
+STATS_CACHE_TTL = float(os.getenv("STATS_CACHE_TTL", "300"))
+# Maximum number of (season, week) stats payloads kept in memory (the rest stay on disk)
+STATS_CACHE_MAX_WEEKS = int(os.getenv("STATS_CACHE_MAX_WEEKS", "64"))
+# Maximum number of leagues whose completed weekly analyses are memoized
+LEAGUE_CACHE_MAX_LEAGUES = int(os.getenv("LEAGUE_CACHE_MAX_LEAGUES", "256"))
+# SQLite database of analyzed leagues, kept across restarts and seasons
+HISTORY_DB = os.getenv("HISTORY_DB", os.path.join(CACHE_DIR, "history.sqlite3"))
+
+# Background analysis jobs
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "100"))
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "600"))
+
+# Where the CPU-bound weekly analysis runs: "inline" (on the event loop),
+# "thread" or "process" (parallel across cores)
+ANALYSIS_EXECUTOR = os.getenv("ANALYSIS_EXECUTOR", "thread").lower()
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", str(os.cpu_count() or 2)))
+
+# Monte Carlo seasons simulated per league for playoff odds (0 disables them); they
+# run on every analysis, and 10k keeps the standard error of each probability under 0.5%.
+# PLAYOFF_SEED fixes the RNG seed, otherwise it is derived from the league and week
+PLAYOFF_SIMULATIONS = int(os.getenv("PLAYOFF_SIMULATIONS", "10000"))
+PLAYOFF_SEED = os.getenv("PLAYOFF_SEED")
+
+# JSON responses at least this large are compressed when the client accepts br or gzip
+RESPONSE_COMPRESS_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+# Cache-Control max-age for /analyze and /league responses; clients revalidate with ETags after that
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "60"))
+# Seconds /league/{league_id} reuses league info and users before refetching them
+LEAGUE_INFO_TTL = float(os.getenv("LEAGUE_INFO_TTL", "60"))
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class SleeperUnavailable(HTTPException):
+    """Sleeper kept failing (throttling, 5xx, timeouts) or the circuit is open"""
+    
+    def __init__(self, detail: str):
+        super().__init__(status_code=503, detail=detail)
+
+class TokenBucket:
+    """Async token-bucket rate limiter shared by every Sleeper request"""
+    
+    def __init__(self, rate_per_minute: float = SLEEPER_RATE_LIMIT, burst: int = SLEEPER_RATE_BURST):
+        self.rate = rate_per_minute / 60
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class CircuitBreaker:
+    """Fails fast after repeated upstream failures, then lets a single trial call through.
+    
+    Closed: every call goes through. Open: calls fail fast for `cooldown`
+    seconds. Half-open: one caller probes Sleeper while the others keep failing
+    fast; its success closes the circuit and its failure reopens it. A probe
+    that never reports back (e.g. cancelled) is replaced after another cooldown.
+    """
+    
+    def __init__(self, threshold: int = SLEEPER_BREAKER_THRESHOLD, cooldown: float = SLEEPER_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_started_at: Optional[float] = None
+    
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None and time.monotonic() - self.opened_at < self.cooldown
+    
+    def check(self):
+        if self.opened_at is None:
+            return
+        now = time.monotonic()
+        probing = self.probe_started_at is not None and now - self.probe_started_at < self.cooldown
+        if self.is_open or probing:
+            raise SleeperUnavailable("Sleeper API is unavailable, retrying shortly")
+        self.probe_started_at = now  # this caller is the trial request
+    
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started_at = None
+    
+    def record_failure(self):
+        self.failures += 1
+        self.probe_started_at = None
+        if self.failures >= self.threshold:
+            if not self.is_open:
+                SLEEPER_CIRCUIT_OPENED.inc()
+                logger.warning("Sleeper circuit breaker opened after %d failed requests", self.failures)
+            self.opened_at = time.monotonic()
 
 class SleeperAPI:
-    def __init__(self):
-        self.base_url = SLEEPER_BASE_URL
+    def __init__(self, base_url: str = SLEEPER_BASE_URL, client: Optional[httpx.AsyncClient] = None,
+                 rate_limiter: Optional[TokenBucket] = None, breaker: Optional[CircuitBreaker] = None,
+                 max_retries: int = SLEEPER_MAX_RETRIES, backoff_base: float = SLEEPER_BACKOFF_BASE,
+                 backoff_max: float = SLEEPER_BACKOFF_MAX):
+        self.base_url = base_url
+        self._client = client
+        self.rate_limiter = rate_limiter or TokenBucket()
+        self.breaker = breaker or CircuitBreaker()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+    
+    def _create_client(self) -> httpx.AsyncClient:
+        """Build a pooled client that keeps connections to Sleeper alive between calls"""
+        http2 = SLEEPER_HTTP2 and _http2_available()
+        if SLEEPER_HTTP2 and not http2:
+            logger.warning("SLEEPER_HTTP2 is set but the h2 package is not installed, using HTTP/1.1")
+        return httpx.AsyncClient(
+            http2=http2,
+            timeout=httpx.Timeout(SLEEPER_TIMEOUT, connect=SLEEPER_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=SLEEPER_MAX_CONNECTIONS,
+                max_keepalive_connections=SLEEPER_MAX_KEEPALIVE,
+                keepalive_expiry=SLEEPER_KEEPALIVE_EXPIRY,
+            ),
+        )
+    
+    async def start(self):
+        """Open the shared client (called from the app lifespan)"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+    
+    async def close(self):
+        """Close the shared client and release pooled connections"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared client, created lazily when used outside the app lifespan"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+    
+    def _backoff(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        """Seconds to wait before retrying: Retry-After if given, else full-jitter exponential"""
+        if response is not None:
+            try:
+                return min(float(response.headers["Retry-After"]), self.backoff_max)
+            except (KeyError, ValueError):
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+    
+    async def _get(self, path: str, endpoint: str) -> httpx.Response:
+        """GET a Sleeper endpoint over the shared connection pool
+        
+        Requests are rate limited and retried on 429, 5xx and network errors.
+        Raises SleeperUnavailable when retries run out or the circuit is open,
+        so throttling is never mistaken for an empty result. `endpoint` is a
+        low-cardinality name used to label request metrics.
+        """
+        self.breaker.check()
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire()
+            started = time.perf_counter()
+            response = None
+            try:
+                response = await self.client.get(f"{self.base_url}{path}")
+            except httpx.TransportError as e:
+                SLEEPER_RESPONSES.inc(endpoint=endpoint, status=type(e).__name__)
+                error = f"{type(e).__name__}: {e}"
+            else:
+                SLEEPER_RESPONSES.inc(endpoint=endpoint, status=response.status_code)
+                SLEEPER_RESPONSE_BYTES.inc(len(response.content), endpoint=endpoint)
+                if response.status_code != 429 and response.status_code < 500:
+                    self.breaker.record_success()
+                    return response
+                error = f"status {response.status_code}"
+            finally:
+                SLEEPER_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+            
+            if attempt == self.max_retries:
+                break
+            delay = self._backoff(attempt, response)
+            SLEEPER_RETRIES.inc(endpoint=endpoint)
+            logger.debug("Retrying %s in %.2fs after %s", endpoint, delay, error)
+            await asyncio.sleep(delay)
+        
+        self.breaker.record_failure()
+        raise SleeperUnavailable(f"Sleeper API request failed ({endpoint}: {error})")
     
     async def get_league(self, league_id: str) -> Dict:
         """Fetch league information"""
-        async with httpx.AsyncClient() as client:
-            url = f"{self.base_url}/league/{league_id}"
-            print(f"Fetching league from: {url}")
-            response = await client.get(url)
-            print(f"League response status: {response.status_code}")
-            if response.status_code != 200:
-                print(f"League response text: {response.text}")
-                raise HTTPException(status_code=404, detail="League not found")
-            return response.json()
+        response = await self._get(f"/league/{league_id}", "league")
+        if response.status_code != 200:
+            logger.warning("League %s not found (status %s): %s", league_id, response.status_code, response.text[:200])
+            raise HTTPException(status_code=404, detail="League not found")
+        return response.json()
     
     async def get_rosters(self, league_id: str) -> List[Dict]:
         """Fetch all rosters in the league"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{self.base_url}/league/{league_id}/rosters")
-            if response.status_code != 200:
-                raise HTTPException(status_code=404, detail="Rosters not found")
-            return response.json()
+        response = await self._get(f"/league/{league_id}/rosters", "rosters")
+        if response.status_code != 200:
+            raise HTTPException(status_code=404, detail="Rosters not found")
+        return response.json()
     
     async def get_users(self, league_id: str) -> List[Dict]:
         """Fetch all users in the league"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{self.base_url}/league/{league_id}/users")
-            if response.status_code != 200:
-                raise HTTPException(status_code=404, detail="Users not found")
-            return response.json()
+        response = await self._get(f"/league/{league_id}/users", "users")
+        if response.status_code != 200:
+            raise HTTPException(status_code=404, detail="Users not found")
+        return response.json()
     
     async def get_matchups(self, league_id: str, week: int) -> List[Dict]:
         """Fetch matchups for a specific week"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{self.base_url}/league/{league_id}/matchups/{week}")
-            if response.status_code != 200:
-                return []
-            return response.json()
+        response = await self._get(f"/league/{league_id}/matchups/{week}", "matchups")
+        if response.status_code != 200:
+            return []
+        return response.json() or []
     
     async def get_player_stats(self, week: int, season: str = "2023") -> Dict:
         """Fetch player stats for a specific week"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{self.base_url}/stats/nfl/regular/{season}/{week}")
-            if response.status_code != 200:
-                return {}
-            return response.json()
+        response = await self._get(f"/stats/nfl/regular/{season}/{week}", "stats")
+        if response.status_code != 200:
+            return {}
+        return response.json() or {}
+    
+    async def get_user_leagues(self, user_id: str, season: str) -> List[Dict]:
+        """Fetch all NFL leagues a user is in for a season"""
+        response = await self._get(f"/user/{user_id}/leagues/nfl/{season}", "user_leagues")
+        if response.status_code != 200:
+            raise HTTPException(status_code=404, detail="User leagues not found")
+        return response.json() or []
     
     async def get_players(self) -> Dict:
         """Fetch all NFL players data"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{self.base_url}/players/nfl")
-            if response.status_code != 200:
-                return {}
-            return response.json()
+        response = await self._get("/players/nfl", "players")
+        if response.status_code != 200:
+            return {}
+        return response.json()
 
-class FantasyAnalytics:
-    def __init__(self):
-        self.sleeper_api = SleeperAPI()
-        self.players_data = {}
-        self.roster_settings = {}
+class PlayerInfo(NamedTuple):
+    """Compact projection of a Sleeper player record"""
+    name: str
+    position: str
+    team: Optional[str]
+
+class PlayerDatabase:
+    """NFL player index cached on disk and refreshed at most once per TTL.
     
-    def set_players_data(self, players_data: Dict):
-        """Set the players data for name lookups"""
-        self.players_data = players_data
+    Only name, position and team are kept from the /players/nfl payload, so the
+    index stays small in memory and on disk.
+    """
     
-    def set_roster_settings(self, roster_settings: Dict):
-        """Set the roster settings for position requirements"""
-        self.roster_settings = roster_settings
+    def __init__(self, cache_dir: str = CACHE_DIR, ttl: float = PLAYERS_CACHE_TTL):
+        self.path = os.path.join(cache_dir, "players_nfl.json")
+        self.ttl = ttl
+        self.players: Dict[str, PlayerInfo] = {}
+        self.fetched_at = 0.0
+        self._lock = asyncio.Lock()
     
-    def get_player_name(self, player_id: str) -> str:
-        """Get player name from player ID"""
-        if player_id in self.players_data:
-            player = self.players_data[player_id]
-            first_name = player.get('first_name', '')
-            last_name = player.get('last_name', '')
-            name = f"{first_name} {last_name}".strip()
-            print(f"      Player lookup: {player_id} -> {name}")
-            return name
-        print(f"      Player not found: {player_id}")
-        return f"Player {player_id}"
+    @staticmethod
+    def project(raw_players: Dict) -> Dict[str, PlayerInfo]:
+        """Reduce the raw Sleeper player dict to id -> PlayerInfo"""
+        players = {}
+        for player_id, player in raw_players.items():
+            name = f"{player.get('first_name') or ''} {player.get('last_name') or ''}".strip()
+            players[player_id] = PlayerInfo(
+                name or player.get('full_name') or f"Player {player_id}",
+                player.get('position') or 'UNK',
+                player.get('team'),
+            )
+        return players
     
-    def get_player_position(self, player_id: str) -> str:
-        """Get player position from player ID"""
-        if player_id in self.players_data:
-            player = self.players_data[player_id]
-            return player.get('position', 'UNK')
-        return 'UNK'
+    def is_stale(self) -> bool:
+        return not self.players or time.time() - self.fetched_at > self.ttl
     
-    def is_valid_position_substitution(self, current_positions: List[str], new_player_pos: str, replaced_player_pos: str) -> bool:
-        """Check if a position substitution is valid according to roster settings"""
-        # Create a copy of current positions
-        test_positions = current_positions.copy()
-        
-        # Remove the replaced player's position
-        if replaced_player_pos in test_positions:
-            test_positions.remove(replaced_player_pos)
-        
-        # Add the new player's position
-        test_positions.append(new_player_pos)
-        
-        # Check if this combination satisfies roster requirements
-        return self._satisfies_roster_requirements(test_positions)
+    def load(self) -> bool:
+        """Load the cached index from disk, returns True if a cache file was read"""
+        try:
+            with open(self.path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        self.players = {pid: PlayerInfo(*fields) for pid, fields in cached.get('players', {}).items()}
+        self.fetched_at = cached.get('fetched_at', 0.0)
+        logger.info("Loaded %d players from %s", len(self.players), self.path)
+        return True
     
-    def _satisfies_roster_requirements(self, positions: List[str]) -> bool:
-        """Check if a list of positions satisfies the roster requirements"""
-        if not self.roster_settings:
-            return True  # If no settings, assume any combination is valid
-        
-        # Count positions
-        pos_counts = {}
-        for pos in positions:
-            pos_counts[pos] = pos_counts.get(pos, 0) + 1
+    def save(self):
+        """Write the index to disk atomically"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({'fetched_at': self.fetched_at, 'players': self.players}, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+    
+    async def get(self, sleeper_api: SleeperAPI) -> Dict[str, PlayerInfo]:
+        """Return the player index, downloading it from Sleeper only when stale"""
+        if not self.is_stale():
+            CACHE_REQUESTS.inc(cache="players", result="hit")
+            return self.players
+        async with self._lock:
+            if not self.is_stale():
+                CACHE_REQUESTS.inc(cache="players", result="hit")
+                return self.players
+            CACHE_REQUESTS.inc(cache="players", result="miss")
+            try:
+                raw_players = await sleeper_api.get_players()
+            except SleeperUnavailable as e:
+                if not self.players:
+                    raise
+                logger.warning("Player index refresh failed, serving the cached index: %s", e.detail)
+                return self.players
+            if not raw_players:
+                # Keep serving the old index if the refresh failed
+                return self.players
+            self.players = self.project(raw_players)
+            self.fetched_at = time.time()
+            try:
+                self.save()
+            except OSError as e:
+                logger.warning("Could not write player cache: %s", e)
+            return self.players
+
+class WeekStats:
+    """One week of player stats as a float64 matrix (players x stat fields).
+    
+    Sleeper's weekly stats are ~2000 players x ~100 fields of nested dicts; one
+    row per player in a NumPy array is far smaller, and `project` cuts it down
+    to the rostered players and scoring fields a league needs. Supports the
+    read-only dict interface the analysis uses (`in`, `[player_id]`, `get`).
+    """
+    
+    __slots__ = ('player_ids', 'index', 'fields', 'field_index', 'values')
+    
+    def __init__(self, player_ids: List[str], fields: Iterable[str], values: np.ndarray):
+        self.player_ids = list(player_ids)
+        self.index = {player_id: row for row, player_id in enumerate(self.player_ids)}
+        self.fields = tuple(fields)
+        self.field_index = {field: col for col, field in enumerate(self.fields)}
+        self.values = values
+    
+    @classmethod
+    def from_payload(cls, payload: Dict) -> "WeekStats":
+        """Pack a raw /stats payload, keeping every numeric field"""
+        lines = {player_id: line for player_id, line in (payload or {}).items() if isinstance(line, dict)}
+        field_index: Dict[str, int] = {}
+        for line in lines.values():
+            for field, value in line.items():
+                if field not in field_index and isinstance(value, (int, float)) and not isinstance(value, bool):
+                    field_index[field] = len(field_index)
+        values = np.zeros((len(lines), len(field_index)))
+        for row, line in enumerate(lines.values()):
+            for field, value in line.items():
+                col = field_index.get(field)
+                if col is not None and isinstance(value, (int, float)):
+                    values[row, col] = value
+        return cls(list(lines), field_index, values)
+    
+    def project(self, player_ids: Optional[Iterable[str]] = None,
+                fields: Optional[Iterable[str]] = None) -> "WeekStats":
+        """Copy restricted to `player_ids` (those with stats) and `fields` (zero when absent)"""
+        rows = list(range(len(self.player_ids))) if player_ids is None else sorted(
+            {self.index[player_id] for player_id in player_ids if player_id in self.index})
+        fields = self.fields if fields is None else tuple(dict.fromkeys(fields))
+        values = np.zeros((len(rows), len(fields)))
+        for col, field in enumerate(fields):
+            source = self.field_index.get(field)
+            if source is not None:
+                values[:, col] = self.values[rows, source]
+        return WeekStats([self.player_ids[row] for row in rows], fields, values)
+    
+    def __len__(self) -> int:
+        return len(self.player_ids)
+    
+    def __contains__(self, player_id) -> bool:
+        return player_id in self.index
+    
+    def __getitem__(self, player_id: str) -> Dict[str, float]:
+        return dict(zip(self.fields, self.values[self.index[player_id]].tolist()))
+    
+    def get(self, player_id: str, default=None):
+        return self[player_id] if player_id in self.index else default
+    
+    def value(self, player_id: str, field: str, default: float = 0.0) -> float:
+        row, col = self.index.get(player_id), self.field_index.get(field)
+        if row is None or col is None:
+            return default
+        return float(self.values[row, col])
+    
+    def save(self, path: str):
+        """Write atomically as an uncompressed .npz"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, player_ids=np.array(self.player_ids, dtype=str),
+                     fields=np.array(self.fields, dtype=str), values=self.values)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path: str) -> "WeekStats":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['player_ids'].tolist(), data['fields'].tolist(), data['values'])
+
+class PlayerStatsCache:
+    """Process-wide cache of weekly player stats keyed by (season, week).
+    
+    Stats do not depend on the league, so every league analysis shares them.
+    Each payload is packed into a WeekStats as soon as it is fetched.
+    Completed weeks are immutable: they are kept indefinitely and persisted to
+    disk. The in-progress week is refetched once its entry is older than `ttl`.
+    """
+    
+    def __init__(self, cache_dir: str = CACHE_DIR, ttl: float = STATS_CACHE_TTL,
+                 max_weeks: int = STATS_CACHE_MAX_WEEKS):
+        self.cache_dir = os.path.join(cache_dir, "stats")
+        self.ttl = ttl
+        self.max_weeks = max_weeks
+        # (season, week) -> (fetched_at, complete, stats), least recently used first
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._locks: Dict[tuple, asyncio.Lock] = {}
+    
+    def _path(self, season: str, week: int) -> str:
+        return os.path.join(self.cache_dir, f"{season}_{week}.npz")
+    
+    def _remember(self, key: tuple, entry: tuple):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_weeks:
+            self._entries.popitem(last=False)
+    
+    def _lookup(self, key: tuple, complete: bool) -> Optional[WeekStats]:
+        """Return cached stats if they are still valid for this request"""
+        entry = self._entries.get(key)
+        if entry is None and complete:
+            entry = self._load(*key)
+        if entry is None:
+            return None
+        fetched_at, entry_complete, stats = entry
+        if not (entry_complete or time.time() - fetched_at <= self.ttl):
+            return None
+        self._entries.move_to_end(key)
+        return stats
+    
+    def _load(self, season: str, week: int) -> Optional[tuple]:
+        try:
+            stats = WeekStats.load(self._path(season, week))
+        except (OSError, ValueError, KeyError):
+            return None
+        entry = (time.time(), True, stats)
+        self._remember((season, week), entry)
+        return entry
+    
+    def _save(self, season: str, week: int, stats: WeekStats):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        stats.save(self._path(season, week))
+    
+    async def get(self, sleeper_api: SleeperAPI, season: str, week: int, complete: bool) -> WeekStats:
+        """Return stats for (season, week), fetching from Sleeper only on a miss.
         
-        # Check QB requirement
-        qb_required = self.roster_settings.get('qb', 0)
-        if pos_counts.get('QB', 0) != qb_required:
-            return False
+        Concurrent misses for the same week share a single upstream request.
+        """
+        key = (str(season), week)
+        stats = self._lookup(key, complete)
+        if stats is not None:
+            CACHE_REQUESTS.inc(cache="stats", result="hit")
+            return stats
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            stats = self._lookup(key, complete)
+            if stats is not None:
+                CACHE_REQUESTS.inc(cache="stats", result="hit")
+                return stats
+            CACHE_REQUESTS.inc(cache="stats", result="miss")
+            stats = WeekStats.from_payload(await sleeper_api.get_player_stats(week, key[0]))
+            if not stats:
+                # Never pin an empty payload; the next request will retry
+                return stats
+            self._remember(key, (time.time(), complete, stats))
+            if complete:
+                try:
+                    self._save(key[0], week, stats)
+                except OSError as e:
+                    logger.warning("Could not write stats cache for %s: %s", key, e)
+            return stats
+
+class LeagueAnalysisCache:
+    """Memoized per-week manager analyses for completed weeks of each league.
+    
+    Only weeks that are over are stored, so a week's presence is its completeness
+    marker. Entries are dropped when the league's roster positions or scoring
+    settings change, and the least recently analyzed leagues are evicted beyond
+    `max_leagues`.
+    """
+    
+    def __init__(self, max_leagues: int = LEAGUE_CACHE_MAX_LEAGUES):
+        self.max_leagues = max_leagues
+        # (league_id, season) -> {'fingerprint': ..., 'weeks': {week: {user_id: weekly entry}}}
+        self._leagues: "OrderedDict[tuple, Dict]" = OrderedDict()
+    
+    @staticmethod
+    def fingerprint(league: Dict) -> tuple:
+        """Settings that change the weekly analysis of an already completed week"""
+        scoring = league.get('scoring_settings') or {}
+        return tuple(league.get('roster_positions') or []), tuple(sorted(scoring.items()))
+    
+    def completed_weeks(self, league_id: str, league: Dict) -> Dict[int, Dict[str, Dict]]:
+        """Return {week: {user_id: weekly entry}} for every memoized completed week"""
+        key = (league_id, str(league.get('season')))
+        cached = self._leagues.get(key)
+        if cached is None or cached['fingerprint'] != self.fingerprint(league):
+            return {}
+        self._leagues.move_to_end(key)
+        return cached['weeks']
+    
+    @staticmethod
+    def completed_through(weeks: Dict[int, Dict]) -> int:
+        """Last week N such that weeks 1..N are all memoized"""
+        week = 0
+        while week + 1 in weeks:
+            week += 1
+        return week
+    
+    def store_week(self, league_id: str, league: Dict, week: int, entries: Dict[str, Dict]):
+        """Memoize the analyses of a completed week (a week without any is never stored)"""
+        if not entries:
+            return
+        key = (league_id, str(league.get('season')))
+        fingerprint = self.fingerprint(league)
+        cached = self._leagues.get(key)
+        if cached is None or cached['fingerprint'] != fingerprint:
+            cached = {'fingerprint': fingerprint, 'weeks': {}}
+            self._leagues[key] = cached
+        cached['weeks'][week] = entries
+        self._leagues.move_to_end(key)
+        while len(self._leagues) > self.max_leagues:
+            self._leagues.popitem(last=False)
+    
+    def invalidate(self, league_id: str):
+        for key in [k for k in self._leagues if k[0] == league_id]:
+            del self._leagues[key]
+
+class PayloadCache:
+    """Recent response payloads with their ETags, reused for `ttl` seconds.
+    
+    Lets polled endpoints answer without refetching, and revalidate with a 304
+    without re-encoding.
+    """
+    
+    def __init__(self, ttl: float = LEAGUE_INFO_TTL, max_entries: int = LEAGUE_CACHE_MAX_LEAGUES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (stored_at, payload, etag)
+    
+    def get(self, key: str) -> Optional[tuple]:
+        """(payload, etag) if the key was stored less than `ttl` seconds ago"""
+        entry = self._entries.get(key)
+        if entry is None or time.time() - entry[0] > self.ttl:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1], entry[2]
+    
+    def put(self, key: str, payload) -> str:
+        etag = content_etag(payload)
+        self._entries[key] = (time.time(), payload, etag)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return etag
+
+class HistoryStore:
+    """SQLite store of analyzed leagues, their users, matchups and weekly analyses.
+    
+    Only weeks that are over are written, so the store can seed the league
+    cache after a restart and past seasons are downloaded and analyzed once.
+    Career stats are aggregated in SQL over the stored weeks. Queries run in a
+    worker thread on one shared connection.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS leagues (
+            league_id TEXT PRIMARY KEY,
+            season TEXT NOT NULL,
+            name TEXT,
+            status TEXT,
+            previous_league_id TEXT,
+            playoff_week_start INTEGER NOT NULL,
+            fingerprint TEXT NOT NULL,
+            complete INTEGER NOT NULL DEFAULT 0,
+            payload BLOB NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS leagues_previous ON leagues (previous_league_id);
+        CREATE TABLE IF NOT EXISTS users (
+            league_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            display_name TEXT,
+            payload BLOB NOT NULL,
+            PRIMARY KEY (league_id, user_id)
+        );
+        CREATE TABLE IF NOT EXISTS matchups (
+            league_id TEXT NOT NULL,
+            week INTEGER NOT NULL,
+            roster_id INTEGER NOT NULL,
+            matchup_id INTEGER,
+            points REAL,
+            payload BLOB NOT NULL,
+            PRIMARY KEY (league_id, week, roster_id)
+        );
+        CREATE TABLE IF NOT EXISTS weekly_analyses (
+            league_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            week INTEGER NOT NULL,
+            actual_points REAL NOT NULL,
+            optimal_points REAL NOT NULL,
+            points_against REAL NOT NULL,
+            result TEXT NOT NULL,
+            payload BLOB NOT NULL,
+            PRIMARY KEY (league_id, user_id, week)
+        );
+        CREATE INDEX IF NOT EXISTS weekly_analyses_user ON weekly_analyses (user_id, league_id);
+    """
+    
+    def __init__(self, path: str = HISTORY_DB):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            if self._conn is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._conn = sqlite3.connect(self.path, check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.executescript(self.SCHEMA)
+            with self._conn:
+                yield self._conn
+    
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    @staticmethod
+    def _fingerprint(league: Dict) -> str:
+        return json.dumps(LeagueAnalysisCache.fingerprint(league))
+    
+    def _league(self, league_id: str) -> Optional[Dict]:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT league_id, season, name, status, previous_league_id, complete FROM leagues "
+                "WHERE league_id = ?", (league_id,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('league_id', 'season', 'name', 'status', 'previous_league_id'), row[:5]),
+                    complete=bool(row[5]))
+    
+    def _completed_weeks(self, league_id: str, league: Dict) -> Dict[int, Dict[str, Dict]]:
+        with self._transaction() as conn:
+            stored = conn.execute("SELECT fingerprint FROM leagues WHERE league_id = ?", (league_id,)).fetchone()
+            if stored is None or stored[0] != self._fingerprint(league):
+                return {}
+            rows = conn.execute("SELECT week, user_id, payload FROM weekly_analyses WHERE league_id = ?",
+                                (league_id,)).fetchall()
+        weeks: Dict[int, Dict[str, Dict]] = {}
+        for week, user_id, payload in rows:
+            weeks.setdefault(week, {})[user_id] = json.loads(payload)
+        return weeks
+    
+    def _record(self, league: Dict, users: List[Dict], matchups: Dict[int, List[Dict]],
+                analyses: Dict[int, Dict[str, Dict]], complete: bool):
+        league_id = league['league_id']
+        fingerprint = self._fingerprint(league)
+        with self._transaction() as conn:
+            stored = conn.execute("SELECT fingerprint FROM leagues WHERE league_id = ?", (league_id,)).fetchone()
+            if stored is not None and stored[0] != fingerprint:
+                # Analyses under the old settings no longer describe the league
+                conn.execute("DELETE FROM weekly_analyses WHERE league_id = ?", (league_id,))
+            conn.execute(
+                "INSERT OR REPLACE INTO leagues VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (league_id, str(league.get('season')), league.get('name'), league.get('status'),
+                 league.get('previous_league_id'), (league.get('settings') or {}).get('playoff_week_start') or 15,
+                 fingerprint, int(complete), dumps_json(league), time.time()))
+            conn.executemany(
+                "INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?)",
+                [(league_id, user['user_id'], user.get('display_name'), dumps_json(user)) for user in users])
+            conn.executemany(
+                "INSERT OR REPLACE INTO matchups VALUES (?, ?, ?, ?, ?, ?)",
+                [(league_id, week, matchup.get('roster_id'), matchup.get('matchup_id'), matchup.get('points'),
+                  dumps_json(matchup))
+                 for week, week_matchups in matchups.items() for matchup in week_matchups])
+            conn.executemany(
+                "INSERT OR REPLACE INTO weekly_analyses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(league_id, user_id, week, entry['actual_points'], entry['optimal_points'],
+                  entry.get('points_against', 0), entry['result'], dumps_json(entry))
+                 for week, entries in analyses.items() for user_id, entry in entries.items()])
+    
+    def _invalidate(self, league_id: str):
+        with self._transaction() as conn:
+            conn.execute("UPDATE leagues SET complete = 0 WHERE league_id = ?", (league_id,))
+            conn.execute("DELETE FROM weekly_analyses WHERE league_id = ?", (league_id,))
+            conn.execute("DELETE FROM matchups WHERE league_id = ?", (league_id,))
+    
+    def _career_stats(self, league_ids: List[str], user_id: Optional[str]) -> Dict[str, Dict]:
+        placeholders = ",".join("?" * len(league_ids))
+        user_filter = " AND a.user_id = ?" if user_id else ""
+        params = [*league_ids, *([user_id] if user_id else [])]
+        with self._transaction() as conn:
+            seasons = conn.execute(
+                f"SELECT a.user_id, a.league_id, l.season, COUNT(*), SUM(a.result = 'W'), "
+                f"SUM(a.actual_points), SUM(a.optimal_points), SUM(a.points_against), MAX(a.actual_points) "
+                f"FROM weekly_analyses a JOIN leagues l ON l.league_id = a.league_id "
+                f"WHERE a.league_id IN ({placeholders}) AND a.week < l.playoff_week_start{user_filter} "
+                f"GROUP BY a.user_id, a.league_id ORDER BY l.season", params).fetchall()
+            names = conn.execute(
+                f"SELECT u.user_id, u.display_name FROM users u JOIN leagues l ON l.league_id = u.league_id "
+                f"WHERE u.league_id IN ({placeholders}) ORDER BY l.season", league_ids).fetchall()
+        display_names = dict(names)  # the latest season's name wins
         
-        # Check RB requirement
-        rb_required = self.roster_settings.get('rb', 0)
-        if pos_counts.get('RB', 0) < rb_required:
-            return False
+        managers: Dict[str, Dict] = {}
+        for user, league_id, season, weeks, wins, actual, optimal, against, best in seasons:
+            career = managers.setdefault(user, {
+                'display_name': display_names.get(user),
+                'seasons': 0,
+                'total_weeks': 0,
+                'wins': 0,
+                'losses': 0,
+                'total_actual_points': 0.0,
+                'total_optimal_points': 0.0,
+                'total_points_against': 0.0,
+                'best_week_points': 0.0,
+                'by_season': {}
+            })
+            career['seasons'] += 1
+            career['total_weeks'] += weeks
+            career['wins'] += wins
+            career['losses'] += weeks - wins
+            career['total_actual_points'] += actual
+            career['total_optimal_points'] += optimal
+            career['total_points_against'] += against
+            career['best_week_points'] = max(career['best_week_points'], best)
+            career['by_season'][season] = {
+                'league_id': league_id,
+                'total_weeks': weeks,
+                'wins': wins,
+                'losses': weeks - wins,
+                'total_actual_points': actual,
+                'total_optimal_points': optimal,
+                'best_week_points': best
+            }
+        for career in managers.values():
+            weeks = career['total_weeks']
+            career['win_percentage'] = career['wins'] / weeks if weeks else 0
+            career['average_actual_points'] = career['total_actual_points'] / weeks if weeks else 0
+            career['points_lost_to_suboptimal_lineups'] = career['total_optimal_points'] - career['total_actual_points']
+        return managers
+    
+    async def league(self, league_id: str) -> Optional[Dict]:
+        """Stored summary of a league (season, name, status, previous_league_id, complete), if any"""
+        return await asyncio.to_thread(self._league, league_id)
+    
+    async def completed_weeks(self, league_id: str, league: Dict) -> Dict[int, Dict[str, Dict]]:
+        """{week: {user_id: weekly entry}} stored under the league's current settings"""
+        return await asyncio.to_thread(self._completed_weeks, league_id, league)
+    
+    async def record(self, league: Dict, users: List[Dict], matchups: Dict[int, List[Dict]],
+                     analyses: Dict[int, Dict[str, Dict]], complete: bool):
+        """Persist a league with the matchups and analyses of weeks that are over.
         
-        # Check WR requirement
-        wr_required = self.roster_settings.get('wr', 0)
-        if pos_counts.get('WR', 0) < wr_required:
-            return False
+        `complete` marks a finished season whose weeks are all stored.
+        """
+        await asyncio.to_thread(self._record, league, users, matchups, analyses, complete)
+    
+    async def invalidate(self, league_id: str):
+        await asyncio.to_thread(self._invalidate, league_id)
+    
+    async def career_stats(self, league_ids: List[str], user_id: Optional[str] = None) -> Dict[str, Dict]:
+        """Regular-season totals per manager across `league_ids`, with a breakdown per season"""
+        if not league_ids:
+            return {}
+        return await asyncio.to_thread(self._career_stats, list(league_ids), user_id)
+
+def build_roster_history(rosters: List[Dict], all_matchups: List[List[Dict]]) -> List[List[Dict]]:
+    """Each week's rosters as they were that week, rebuilt from the matchup payloads.
+    
+    Sleeper's /rosters only returns current rosters, but every matchup carries
+    the team's `players` and `starters` for its week. The current rosters are
+    used for the owner mapping, and as a fallback when a matchup has no players.
+    """
+    current = {roster.get('roster_id'): roster for roster in rosters}
+    history = []
+    for week_matchups in all_matchups:
+        week_rosters = []
+        for matchup in week_matchups:
+            roster_id = matchup.get('roster_id')
+            roster = current.get(roster_id, {})
+            if matchup.get('players'):
+                players, starters = matchup['players'], matchup.get('starters') or []
+            else:
+                players, starters = roster.get('players') or [], roster.get('starters') or []
+            week_rosters.append({
+                'roster_id': roster_id,
+                'owner_id': roster.get('owner_id'),
+                'players': players,
+                'starters': starters
+            })
+        history.append(week_rosters)
+    return history
+
+async def ingest_weeks(sleeper_api: SleeperAPI, league_id: str, season: str, current_week: int,
+                       concurrency: int = INGEST_CONCURRENCY,
+                       stats_cache: Optional[PlayerStatsCache] = None, start_week: int = 1,
+                       on_progress: Optional[Callable[[int, int], None]] = None,
+                       stat_fields: Optional[Iterable[str]] = None, rosters: Optional[List[Dict]] = None):
+    """Fetch matchups and player stats for weeks start_week..current_week concurrently.
+    
+    At most `concurrency` requests are in flight at once. Player stats come from
+    `stats_cache` when given; weeks before `current_week` count as completed.
+    Rosters are fetched once for the owner mapping (unless `rosters` is given)
+    and each week's roster is rebuilt from its matchups (see build_roster_history).
+    Each week's stats are projected to that week's rostered players and to
+    `stat_fields` (all fields when None) as a WeekStats.
+    `on_progress(completed, total)` is called as each request finishes.
+    Results are returned as (all_matchups, all_rosters, all_player_stats), each
+    ordered by week.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    weeks = list(range(start_week, current_week + 1))
+    total = 2 * len(weeks) + (rosters is None)
+    completed = 0
+    
+    async def bounded(coro):
+        nonlocal completed
+        async with semaphore:
+            result = await coro
+        completed += 1
+        if on_progress is not None:
+            on_progress(completed, total)
+        return result
+    
+    matchups_tasks = [bounded(sleeper_api.get_matchups(league_id, week)) for week in weeks]
+    if stats_cache is not None:
+        stats_tasks = [bounded(stats_cache.get(sleeper_api, season, week, complete=week < current_week))
+                       for week in weeks]
+    else:
+        async def fetch_stats(week: int) -> WeekStats:
+            return WeekStats.from_payload(await sleeper_api.get_player_stats(week, season))
+        stats_tasks = [bounded(fetch_stats(week)) for week in weeks]
+    
+    async def fetched_rosters() -> List[Dict]:
+        return rosters
+    rosters_task = bounded(sleeper_api.get_rosters(league_id)) if rosters is None else fetched_rosters()
+    rosters, *results = await asyncio.gather(rosters_task, *matchups_tasks, *stats_tasks)
+    n = len(weeks)
+    all_matchups = results[:n]
+    all_rosters = build_roster_history(rosters, all_matchups)
+    all_player_stats = [
+        stats.project({player_id for roster in week_rosters for player_id in roster['players']}, stat_fields)
+        for stats, week_rosters in zip(results[n:], all_rosters)
+    ]
+    return all_matchups, all_rosters, all_player_stats
+
+# Player positions each starting slot accepts
+SLOT_ELIGIBILITY = {
+    'QB': {'QB'},
+    'RB': {'RB'},
+    'WR': {'WR'},
+    'TE': {'TE'},
+    'K': {'K'},
+    'DEF': {'DEF'},
+    'FLEX': {'RB', 'WR', 'TE'},
+    'WRRB_FLEX': {'WR', 'RB'},
+    'REC_FLEX': {'WR', 'TE'},
+    'SUPER_FLEX': {'QB', 'RB', 'WR', 'TE'},
+    'DL': {'DL'},
+    'LB': {'LB'},
+    'DB': {'DB'},
+    'IDP_FLEX': {'DL', 'LB', 'DB'},
+}
+
+# Roster slots that do not score
+NON_STARTING_SLOTS = {'BN', 'IR', 'TAXI'}
+
+# Detailed IDP positions folded into Sleeper's DL/LB/DB slot groups
+POSITION_ALIASES = {
+    'DE': 'DL', 'DT': 'DL', 'NT': 'DL',
+    'ILB': 'LB', 'OLB': 'LB', 'MLB': 'LB',
+    'CB': 'DB', 'S': 'DB', 'SS': 'DB', 'FS': 'DB',
+}
+
+class LineupOptimizer:
+    """Exact optimal lineup solver for a league's starting slots.
+    
+    Slot eligibility is computed once per position. Because every slot is worth
+    the same, a maximum-points lineup is found by adding players in descending
+    point order and keeping each one that still fits via an augmenting path
+    (greedy over the slot-assignment matroid), which is exact for any mix of
+    FLEX, SUPER_FLEX, WRRB_FLEX, REC_FLEX and IDP slots.
+    """
+    
+    def __init__(self, roster_positions: List[str]):
+        self.slots = [slot for slot in roster_positions if slot not in NON_STARTING_SLOTS]
+        self._eligible_slots: Dict[str, tuple] = {}
+        for position in set().union(*SLOT_ELIGIBILITY.values()):
+            self.eligible_slots(position)
+    
+    def eligible_slots(self, position: str) -> tuple:
+        """Indices of the slots a position can fill, most restrictive slot first"""
+        position = POSITION_ALIASES.get(position, position)
+        if position not in self._eligible_slots:
+            slots = [i for i, slot in enumerate(self.slots)
+                     if position in SLOT_ELIGIBILITY.get(slot, {slot})]
+            slots.sort(key=lambda i: len(SLOT_ELIGIBILITY.get(self.slots[i], ())))
+            self._eligible_slots[position] = tuple(slots)
+        return self._eligible_slots[position]
+    
+    def solve(self, candidates: List[Dict], started_slots: Optional[Dict[str, int]] = None) -> List[Dict]:
+        """Return the maximum-points lineup as candidate dicts with 'slot' and 'slot_index' keys.
         
-        # Check TE requirement
-        te_required = self.roster_settings.get('te', 0)
-        if pos_counts.get('TE', 0) < te_required:
-            return False
+        `started_slots` maps player_id -> slot index the player actually started
+        in, so a starter whose position is unknown can still keep that slot, and
+        starters who stay in the lineup keep their own slot whenever the
+        newcomers can be placed around them. Players with negative points are
+        left out rather than started.
+        """
+        started_slots = started_slots or {}
+        eligible = []
+        for candidate in candidates:
+            slots = self.eligible_slots(candidate['position'])
+            started = started_slots.get(candidate['player_id'])
+            if started is not None and started not in slots:
+                slots = slots + (started,)
+            eligible.append(slots)
         
-        # Check K requirement
-        k_required = self.roster_settings.get('k', 0)
-        if pos_counts.get('K', 0) != k_required:
-            return False
+        slot_owner: List[Optional[int]] = [None] * len(self.slots)
+        filled = 0
+        order = sorted(range(len(candidates)), key=lambda i: candidates[i]['points'], reverse=True)
+        for i in order:
+            if filled == len(self.slots) or candidates[i]['points'] < 0:
+                break
+            if eligible[i] and self._augment(i, eligible, slot_owner, set()):
+                filled += 1
         
-        # Check DEF requirement
-        def_required = self.roster_settings.get('def', 0)
-        if pos_counts.get('DEF', 0) != def_required:
-            return False
+        if started_slots:
+            # Re-place the chosen players: starters pinned to their slot, the rest
+            # augmented in (always possible, since the chosen set fits)
+            chosen = [owner for owner in slot_owner if owner is not None]
+            slot_owner = [None] * len(self.slots)
+            newcomers = []
+            for i in chosen:
+                started = started_slots.get(candidates[i]['player_id'])
+                if started is not None and started in eligible[i] and slot_owner[started] is None:
+                    slot_owner[started] = i
+                else:
+                    newcomers.append(i)
+            for i in newcomers:
+                self._augment(i, eligible, slot_owner, set())
         
-        # Check FLEX positions (WR/RB/TE)
-        flex_required = self.roster_settings.get('flex', 0)
-        flex_positions = pos_counts.get('WR', 0) + pos_counts.get('RB', 0) + pos_counts.get('TE', 0)
-        if flex_positions < (rb_required + wr_required + te_required + flex_required):
-            return False
+        return [dict(candidates[owner], slot=self.slots[slot], slot_index=slot)
+                for slot, owner in enumerate(slot_owner) if owner is not None]
+    
+    def _augment(self, i: int, eligible: List[tuple], slot_owner: List[Optional[int]], seen: set) -> bool:
+        """Find a slot for candidate i, moving already placed players if needed"""
+        for slot in eligible[i]:
+            if slot_owner[slot] is None:
+                slot_owner[slot] = i
+                return True
+        for slot in eligible[i]:
+            if slot in seen:
+                continue
+            seen.add(slot)
+            if slot_owner[slot] is None or self._augment(slot_owner[slot], eligible, slot_owner, seen):
+                slot_owner[slot] = i
+                return True
+        return False
+
+class LeagueSeason:
+    """Indexed view of a league's ingested weeks, built once per analysis.
+    
+    Replaces per-manager linear scans with dict lookups:
+    owner_id -> roster_id, (week, roster_id) -> roster / matchup and
+    (week, matchup_id) -> the matchups paired against each other.
+    """
+    
+    def __init__(self, all_matchups: List[List[Dict]], all_rosters: List[List[Dict]],
+                 all_player_stats: List[Dict], first_week: int = 1):
+        self.weeks = list(range(first_week, first_week + len(all_matchups)))
+        self.roster_ids: Dict[str, int] = {}
+        self.rosters: Dict[tuple, Dict] = {}
+        self.matchups: Dict[tuple, Dict] = {}
+        self.pairs: Dict[tuple, List[Dict]] = {}
+        self.player_stats: Dict[int, Dict] = {}
         
-        return True
+        for week, week_matchups, week_rosters, week_player_stats in zip(
+                self.weeks, all_matchups, all_rosters, all_player_stats):
+            self.player_stats[week] = week_player_stats
+            for roster in week_rosters:
+                roster_id = roster.get('roster_id')
+                if roster.get('owner_id') is not None:
+                    self.roster_ids[roster['owner_id']] = roster_id
+                self.rosters[(week, roster_id)] = roster
+            for matchup in week_matchups:
+                self.matchups[(week, matchup.get('roster_id'))] = matchup
+                if matchup.get('matchup_id') is not None:
+                    self.pairs.setdefault((week, matchup['matchup_id']), []).append(matchup)
+    
+    def opponent(self, week: int, matchup: Dict) -> Optional[Dict]:
+        """The other matchup sharing this matchup's matchup_id, if any"""
+        for other in self.pairs.get((week, matchup.get('matchup_id')), ()):
+            if other.get('roster_id') != matchup.get('roster_id'):
+                return other
+        return None
+
+# Sleeper scoring keys that weight a stat for one position only: key -> (stat, position)
+POSITION_SCORING = {
+    'bonus_rec_te': ('rec', 'TE'),
+    'bonus_rec_rb': ('rec', 'RB'),
+    'bonus_rec_wr': ('rec', 'WR'),
+}
+
+class ScoringEngine:
+    """League scoring as a weight vector over stat fields.
+    
+    Sleeper's scoring_settings keys match the stat fields of its weekly stats
+    (pass_td, rec, pts_allow_7_13, ...), so a week is scored as one
+    stats-matrix x weights product. Position-only bonuses such as TE premium
+    are added for the rows of that position.
+    """
     
-    def analyze_weekly_performance(self, roster: Dict, matchup: Dict, player_stats: Dict) -> Dict:
-        """Analyze a team's weekly performance and suggest optimal lineup"""
+    def __init__(self, scoring_settings: Dict[str, float]):
+        self.scoring_settings = dict(scoring_settings or {})
+        weights, bonuses = {}, []
+        for key, weight in self.scoring_settings.items():
+            if not isinstance(weight, (int, float)) or isinstance(weight, bool) or not weight:
+                continue
+            if key in POSITION_SCORING:
+                bonuses.append((*POSITION_SCORING[key], float(weight)))
+            else:
+                weights[key] = float(weight)
+        self.fields = tuple(sorted(set(weights) | {stat for stat, _, _ in bonuses}))
+        self.weights = np.array([weights.get(field, 0.0) for field in self.fields])
+        self.position_bonuses = [(self.fields.index(stat), position, weight) for stat, position, weight in bonuses]
+    
+    def score_matrix(self, values: np.ndarray, positions: List[str]) -> np.ndarray:
+        """Points for each row of a players x self.fields matrix, rounded like Sleeper"""
+        points = values @ self.weights
+        for col, position, weight in self.position_bonuses:
+            mask = np.fromiter((p == position for p in positions), dtype=bool, count=len(positions))
+            points += mask * values[:, col] * weight
+        return np.round(points, 2)
+    
+    def score_weeks(self, all_player_stats: List["WeekStats"],
+                    position: Callable[[str], str]) -> List[Dict[str, float]]:
+        """{player_id: points} for every week, scored in a single batched product"""
+        projected = [stats.project(fields=self.fields) for stats in all_player_stats]
+        player_ids = [player_id for stats in projected for player_id in stats.player_ids]
+        if not player_ids:
+            return [{} for _ in projected]
+        points = self.score_matrix(np.vstack([stats.values for stats in projected]),
+                                   [position(player_id) for player_id in player_ids]).tolist()
+        weeks, start = [], 0
+        for stats in projected:
+            end = start + len(stats)
+            weeks.append(dict(zip(player_ids[start:end], points[start:end])))
+            start = end
+        return weeks
+
+def rescore_matchups(all_matchups: List[List[Dict]], all_player_stats: List["WeekStats"],
+                     scoring: ScoringEngine, position: Callable[[str], str]) -> List[List[Dict]]:
+    """Copies of each week's matchups with every player's points recomputed under `scoring`"""
+    all_points = scoring.score_weeks(all_player_stats, position)
+    rescored = []
+    for week_matchups, points in zip(all_matchups, all_points):
+        week_rescored = []
+        for matchup in week_matchups:
+            players_points = {pid: points.get(pid, 0.0) for pid in matchup.get('players') or []}
+            starters_points = [points.get(pid, 0.0) for pid in matchup.get('starters') or []]
+            week_rescored.append({**matchup, 'players_points': players_points,
+                                  'starters_points': starters_points, 'points': round(sum(starters_points), 2)})
+        rescored.append(week_rescored)
+    return rescored
+
+def league_stat_fields(league: Dict) -> tuple:
+    """Stat fields a league's analysis reads: PPR points plus every stat its scoring weights"""
+    return ('pts_ppr',) + ScoringEngine(league.get('scoring_settings') or {}).fields
+
+class LeagueContext(NamedTuple):
+    """Immutable per-league inputs to the analytics engine.
+    
+    Built once per analysis and passed explicitly, so concurrent analyses of
+    leagues with different settings never share mutable state.
+    """
+    players: Dict[str, PlayerInfo]
+    lineup_optimizer: Optional[LineupOptimizer]
+    scoring: Optional[ScoringEngine] = None
+    
+    @classmethod
+    def from_league(cls, league: Dict, players: Dict[str, PlayerInfo]) -> "LeagueContext":
+        roster_positions = league.get('roster_positions') or []
+        scoring_settings = league.get('scoring_settings')
+        return cls(players, LineupOptimizer(roster_positions) if roster_positions else None,
+                   ScoringEngine(scoring_settings) if scoring_settings else None)
+    
+    def week_points(self, player_stats) -> Dict[str, float]:
+        """League-scored points for every player in a week's stats (PPR without scoring settings)"""
+        if not isinstance(player_stats, WeekStats):
+            player_stats = WeekStats.from_payload(player_stats)
+        if self.scoring is None:
+            return {player_id: player_stats.value(player_id, 'pts_ppr') for player_id in player_stats.player_ids}
+        return self.scoring.score_weeks([player_stats], self.player_position)[0]
+    
+    def restricted_to(self, player_ids: set) -> "LeagueContext":
+        """Copy of the context whose player index only covers `player_ids`"""
+        return self._replace(players={pid: self.players[pid] for pid in player_ids if pid in self.players})
+    
+    def player_name(self, player_id: str) -> str:
+        """Get player name from player ID"""
+        if player_id in self.players:
+            return self.players[player_id].name
+        return f"Player {player_id}"
+    
+    def player_position(self, player_id: str) -> str:
+        """Get player position from player ID"""
+        if player_id in self.players:
+            return self.players[player_id].position
+        return 'UNK'
+
+class FantasyAnalytics:
+    """Stateless analytics engine; league-specific inputs come from a LeagueContext"""
+    
+    def __init__(self):
+        self.sleeper_api = SleeperAPI()
+    
+    def analyze_weekly_performance(self, context: LeagueContext, roster: Dict, matchup: Dict, player_stats: Dict,
+                                   player_points: Optional[Dict[str, float]] = None) -> Dict:
+        """Analyze a team's weekly performance and suggest optimal lineup
+        
+        Bench players are scored with the league's own scoring: Sleeper's
+        `players_points` from the matchup when present, else `player_points`
+        (context.week_points of the week's stats, computed here when not given).
+        """
         try:
             starters = roster.get('starters', [])
             players = roster.get('players', [])
@@ -180,8 +1419,9 @@ class FantasyAnalytics:
             # Get starter points from matchup data, not roster data
             starters_points = matchup.get('starters_points', [])
             
-            print(f"      Roster analysis - Starters: {len(starters)}, Players: {len(players)}, Starter points: {len(starters_points)}")
-            print(f"      Actual starter points: {starters_points[:3]}...")  # Show first 3 actual point values
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Roster analysis - starters: %d, players: %d, starter points: %d",
+                             len(starters), len(players), len(starters_points))
             
             # Get actual starters performance
             actual_performance = []
@@ -189,60 +1429,72 @@ class FantasyAnalytics:
                 if i < len(starters_points):
                     actual_performance.append({
                         'player_id': player_id,
-                        'name': self.get_player_name(player_id),
+                        'name': context.player_name(player_id),
                         'points': starters_points[i],
-                        'position': self.get_player_position(player_id)
+                        'position': context.player_position(player_id)
                     })
             
             # Calculate optimal lineup from bench players
             bench_players = [p for p in players if p not in starters]
             bench_performance = []
             
+            matchup_points = matchup.get('players_points') or {}
+            unscored = [pid for pid in bench_players if pid not in matchup_points and pid in player_stats]
+            if unscored and player_points is None:
+                player_points = context.week_points({pid: player_stats[pid] for pid in unscored})
             for player_id in bench_players:
-                if player_id in player_stats:
-                    points = player_stats[player_id].get('pts_ppr', 0)
+                if player_id in matchup_points or player_id in player_stats:
+                    points = matchup_points[player_id] if player_id in matchup_points else player_points.get(player_id, 0)
                     bench_performance.append({
                         'player_id': player_id,
-                        'name': self.get_player_name(player_id),
+                        'name': context.player_name(player_id),
                         'points': points,
-                        'position': self.get_player_position(player_id)
+                        'position': context.player_position(player_id)
                     })
             
-            # Sort bench players by points
-            bench_performance.sort(key=lambda x: x['points'], reverse=True)
-            
-            # Find optimal lineup with position-aware improvements
-            optimal_lineup = actual_performance.copy()
-            improvements = []
+            # Solve the optimal lineup exactly over starters and bench
+            optimizer = context.lineup_optimizer or LineupOptimizer([p['position'] for p in actual_performance])
+            started_slots = {}
+            if len(starters) == len(optimizer.slots):
+                started_slots = {player_id: i for i, player_id in enumerate(starters)}
+            candidates = [p for p in actual_performance if p['player_id'] != '0'] + bench_performance
+            optimal_lineup = optimizer.solve(candidates, started_slots)
             
-            # Get current starter positions
-            current_positions = [p['position'] for p in actual_performance]
+            # Pair each changed slot's starter with the slot's optimal occupant
+            def empty_slot(slot_index: int) -> Dict:
+                return {'player_id': '0', 'name': 'Empty slot', 'points': 0, 'position': optimizer.slots[slot_index]}
             
-            # Try to improve lineup with position-aware substitutions
-            if optimal_lineup and len(optimal_lineup) > 0:
-                # Sort starters by points (worst first)
-                optimal_lineup.sort(key=lambda x: x['points'])
-                
-                for bench_player in bench_performance:
-                    # Find the worst starter that can be replaced
-                    for i, starter in enumerate(optimal_lineup):
-                        # Check if this substitution would be valid positionally
-                        if self.is_valid_position_substitution(current_positions, bench_player['position'], starter['position']):
-                            if bench_player['points'] > starter['points']:
-                                # Make the substitution
-                                replaced_player = optimal_lineup.pop(i)
-                                optimal_lineup.append(bench_player)
-                                
-                                # Update position list
-                                current_positions.remove(replaced_player['position'])
-                                current_positions.append(bench_player['position'])
-                                
-                                improvements.append({
-                                    'replaced': replaced_player,
-                                    'with': bench_player,
-                                    'point_gain': bench_player['points'] - replaced_player['points']
-                                })
-                                break  # Move to next bench player
+            improvements = []
+            if started_slots:
+                occupants = {p['slot_index']: p for p in optimal_lineup}
+                for slot_index, starter in enumerate(actual_performance):
+                    occupant = occupants.get(slot_index)
+                    if occupant is not None and occupant['player_id'] == starter['player_id']:
+                        continue
+                    replaced_player = starter if starter['player_id'] != '0' else empty_slot(slot_index)
+                    new_player = occupant if occupant is not None else empty_slot(slot_index)
+                    if new_player['player_id'] == replaced_player['player_id']:
+                        continue
+                    improvements.append({
+                        'replaced': replaced_player,
+                        'with': new_player,
+                        'point_gain': new_player['points'] - replaced_player['points']
+                    })
+            else:
+                # Starters do not line up with the slots: pair by points instead
+                optimal_ids = {p['player_id'] for p in optimal_lineup}
+                actual_ids = {p['player_id'] for p in actual_performance}
+                added = sorted((p for p in optimal_lineup if p['player_id'] not in actual_ids),
+                               key=lambda x: x['points'], reverse=True)
+                removed = sorted((p for p in actual_performance if p['player_id'] not in optimal_ids),
+                                 key=lambda x: x['points'])
+                for i, bench_player in enumerate(added):
+                    replaced_player = removed[i] if i < len(removed) else empty_slot(bench_player['slot_index'])
+                    improvements.append({
+                        'replaced': replaced_player,
+                        'with': bench_player,
+                        'point_gain': bench_player['points'] - replaced_player['points']
+                    })
             
             return {
                 'actual_points': sum(p['points'] for p in actual_performance),
@@ -252,7 +1504,7 @@ class FantasyAnalytics:
                 'optimal_lineup': optimal_lineup
             }
         except Exception as e:
-            print(f"Error in analyze_weekly_performance: {e}")
+            logger.exception("Error in analyze_weekly_performance: %s", e)
             # Return default values if analysis fails
             return {
                 'actual_points': 0,
@@ -268,77 +1520,79 @@ class FantasyAnalytics:
             return player_stats[player_id].get('position', 'UNK')
         return 'UNK'
     
-    def analyze_season_performance(self, user_id: str, all_matchups: List[List[Dict]], all_rosters: List[List[Dict]], all_player_stats: List[Dict]) -> Dict:
-        """Analyze a manager's entire season performance"""
-        season_data = []
-        total_actual_points = 0
-        total_optimal_points = 0
-        wins = 0
-        losses = 0
+    def analyze_season_performance(self, context: LeagueContext, user_id: str, all_matchups: List[List[Dict]], all_rosters: List[List[Dict]], all_player_stats: List[Dict], first_week: int = 1) -> Dict:
+        """Analyze a manager's entire season performance
+        
+        The weekly lists start at `first_week`, which lets callers analyze only
+        the weeks that are not memoized yet.
+        """
+        league_season = LeagueSeason(all_matchups, all_rosters, all_player_stats, first_week)
+        weekly_data = self.analyze_league_season(context, league_season, [user_id])
+        return self.summarize_season(weekly_data[user_id])
+    
+    def analyze_league_season(self, context: LeagueContext, league_season: LeagueSeason, user_ids: List[str]) -> Dict[str, List[Dict]]:
+        """Analyze every manager's weeks in a single pass over the indexed season
+        
+        Returns {user_id: [weekly entry, ...]} ordered by week.
+        """
+        season_data = {user_id: [] for user_id in user_ids}
         
         try:
-            for week, (week_matchups, week_rosters, week_player_stats) in enumerate(zip(all_matchups, all_rosters, all_player_stats), 1):
-                print(f"    Processing week {week} for user {user_id}")
-                
-                # Find user's roster for this week
-                user_roster = next((r for r in week_rosters if r.get('owner_id') == user_id), None)
-                if not user_roster:
-                    print(f"    No roster found for user {user_id} in week {week}")
-                    continue
-                
-                # Find user's matchup for this week
-                user_matchup = next((m for m in week_matchups if m.get('roster_id') == user_roster.get('roster_id')), None)
-                if not user_matchup:
-                    print(f"    No matchup found for roster {user_roster.get('roster_id')} in week {week}")
-                    continue
-                
-                # Find opponent's matchup (same matchup_id but different roster_id)
-                opponent_matchup = next((m for m in week_matchups 
-                                       if m.get('matchup_id') == user_matchup.get('matchup_id') 
-                                       and m.get('roster_id') != user_roster.get('roster_id')), None)
-                
-                # Calculate points against from opponent's points
-                points_against = opponent_matchup.get('points', 0) if opponent_matchup else 0
-                
-                # Debug: Check matchup data structure
-                if week == 1:
-                    print(f"    Matchup keys: {list(user_matchup.keys())}")
-                    print(f"    Starters points from matchup: {user_matchup.get('starters_points', [])[:3]}...")
-                    print(f"    Total points: {user_matchup.get('points', 0)}")
-                    print(f"    Points against: {points_against}")
-                    print(f"    Matchup ID: {user_matchup.get('matchup_id')}")
-                    if opponent_matchup:
-                        print(f"    Opponent roster ID: {opponent_matchup.get('roster_id')}")
-                        print(f"    Opponent points: {opponent_matchup.get('points', 0)}")
-                
-                # Analyze weekly performance
-                try:
-                    weekly_analysis = self.analyze_weekly_performance(user_roster, user_matchup, week_player_stats)
+            for week in league_season.weeks:
+                week_started = time.perf_counter()
+                week_player_stats = league_season.player_stats[week]
+                week_points = None  # scored on first need; Sleeper's matchups usually carry players_points
+                for user_id in user_ids:
+                    roster_id = league_season.roster_ids.get(user_id)
+                    user_roster = league_season.rosters.get((week, roster_id))
+                    if not user_roster:
+                        logger.debug("No roster found for user %s in week %d", user_id, week)
+                        continue
                     
-                    season_data.append({
-                        'week': week,
-                        'actual_points': weekly_analysis['actual_points'],
-                        'optimal_points': weekly_analysis['optimal_points'],
-                        'improvements': weekly_analysis['improvements'],
-                        'result': 'W' if user_matchup.get('points', 0) > points_against else 'L'
-                    })
+                    user_matchup = league_season.matchups.get((week, roster_id))
+                    if not user_matchup:
+                        logger.debug("No matchup found for roster %s in week %d", roster_id, week)
+                        continue
                     
-                    total_actual_points += weekly_analysis['actual_points']
-                    total_optimal_points += weekly_analysis['optimal_points']
+                    # Calculate points against from opponent's points
+                    opponent_matchup = league_season.opponent(week, user_matchup)
+                    points_against = opponent_matchup.get('points', 0) if opponent_matchup else 0
                     
-                    if user_matchup.get('points', 0) > points_against:
-                        wins += 1
-                    else:
-                        losses += 1
+                    # Analyze weekly performance
+                    try:
+                        if week_points is None and not user_matchup.get('players_points'):
+                            week_points = context.week_points(week_player_stats)
+                        weekly_analysis = self.analyze_weekly_performance(context, user_roster, user_matchup,
+                                                                          week_player_stats, week_points)
                         
-                except Exception as e:
-                    print(f"    Error analyzing week {week}: {e}")
-                    continue
+                        season_data[user_id].append({
+                            'week': week,
+                            'actual_points': weekly_analysis['actual_points'],
+                            'optimal_points': weekly_analysis['optimal_points'],
+                            'points_for': user_matchup.get('points', 0),
+                            'points_against': points_against,
+                            'improvements': weekly_analysis['improvements'],
+                            'result': 'W' if user_matchup.get('points', 0) > points_against else 'L'
+                        })
                     
+                    except Exception as e:
+                        logger.warning("Error analyzing week %d for user %s: %s", week, user_id, e)
+                        continue
+                
+                WEEK_ANALYSIS_SECONDS.observe(time.perf_counter() - week_started)
+        
         except Exception as e:
-            print(f"Error in analyze_season_performance: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error in analyze_league_season: %s", e)
+        
+        return season_data
+    
+    @staticmethod
+    def summarize_season(season_data: List[Dict]) -> Dict:
+        """Build season totals from a manager's weekly entries"""
+        total_actual_points = sum(w['actual_points'] for w in season_data)
+        total_optimal_points = sum(w['optimal_points'] for w in season_data)
+        wins = sum(1 for w in season_data if w['result'] == 'W')
+        losses = len(season_data) - wins
         
         return {
             'total_weeks': len(season_data),
@@ -353,123 +1607,1110 @@ class FantasyAnalytics:
             'weekly_data': season_data
         }
 
-# Initialize analytics engine
-analytics = FantasyAnalytics()
+def analyze_ingested_weeks(context: LeagueContext, all_matchups: List[List[Dict]], all_rosters: List[List[Dict]],
+                           all_player_stats: List[Dict], first_week: int, user_ids: List[str]) -> Dict[str, List[Dict]]:
+    """Index the ingested weeks and analyze every manager (executor entry point)"""
+    league_season = LeagueSeason(all_matchups, all_rosters, all_player_stats, first_week)
+    return analytics.analyze_league_season(context, league_season, user_ids)
 
-@app.get("/", response_class=HTMLResponse)
-async def home(request: Request):
-    """Main dashboard page"""
-    return templates.TemplateResponse("index.html", {"request": request})
+class AnalysisExecutor:
+    """Runs the CPU-bound weekly analysis off the event loop.
+    
+    In "process" mode the player index is trimmed to rostered players before it
+    is pickled (stats are already projected at ingestion), so only what the
+    analysis reads crosses the process boundary.
+    Metrics observed inside worker processes are not reported on /metrics.
+    """
+    
+    def __init__(self, mode: str = ANALYSIS_EXECUTOR, workers: int = ANALYSIS_WORKERS):
+        if mode not in ("inline", "thread", "process"):
+            raise ValueError(f"ANALYSIS_EXECUTOR must be inline, thread or process, not {mode!r}")
+        self.mode = mode
+        self.workers = max(1, workers)
+        self._pool: Optional[Executor] = None
+    
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.mode == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="analysis")
+        return self._pool
+    
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+    
+    async def run(self, fn: Callable, *args):
+        """Run another CPU-bound function the same way (it must be picklable in process mode)"""
+        if self.mode == "inline":
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(self._get_pool(), fn, *args)
+    
+    async def analyze_weeks(self, context: LeagueContext, all_matchups: List[List[Dict]],
+                            all_rosters: List[List[Dict]], all_player_stats: List[Dict],
+                            first_week: int, user_ids: List[str]) -> Dict[str, List[Dict]]:
+        """Run analyze_ingested_weeks according to the configured mode"""
+        if self.mode == "inline":
+            return analyze_ingested_weeks(context, all_matchups, all_rosters, all_player_stats, first_week, user_ids)
+        
+        if self.mode == "process":
+            rostered = set()
+            for week_rosters in all_rosters:
+                for roster in week_rosters:
+                    rostered.update(roster.get('players') or ())
+            context = context.restricted_to(rostered)
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_pool(), analyze_ingested_weeks,
+            context, all_matchups, all_rosters, all_player_stats, first_week, user_ids
+        )
 
-@app.post("/analyze")
-async def analyze_league(league_id: str = Form(...)):
-    """Analyze a league and return comprehensive analytics"""
-    try:
-        print(f"Analyzing league: {league_id}")
+class SeasonMatrix:
+    """Columnar teams x weeks view of a league season.
+    
+    Weekly entries are packed into NumPy arrays (NaN where a team has no entry)
+    so season totals and league-wide metrics are computed for every manager in
+    one batched pass.
+    """
+    
+    def __init__(self, season_data: Dict[str, List[Dict]], weeks: List[int]):
+        self.user_ids = list(season_data)
+        self.weeks = list(weeks)
+        self.season_data = season_data
+        shape = (len(self.user_ids), len(self.weeks))
+        self.actual = np.full(shape, np.nan)
+        self.optimal = np.full(shape, np.nan)
+        self.points_for = np.full(shape, np.nan)
+        self.points_against = np.full(shape, np.nan)
+        self.won = np.zeros(shape, dtype=bool)
         
-        # Fetch league data
-        league = await analytics.sleeper_api.get_league(league_id)
-        print(f"League data fetched: {league.get('name', 'Unknown')}")
+        column = {week: j for j, week in enumerate(self.weeks)}
+        for i, user_id in enumerate(self.user_ids):
+            for entry in season_data[user_id]:
+                j = column.get(entry['week'])
+                if j is None:
+                    continue
+                self.actual[i, j] = entry['actual_points']
+                self.optimal[i, j] = entry['optimal_points']
+                self.points_for[i, j] = entry.get('points_for', entry['actual_points'])
+                self.points_against[i, j] = entry.get('points_against', 0)
+                self.won[i, j] = entry['result'] == 'W'
+        self.played = ~np.isnan(self.actual)
+    
+    def summaries(self) -> Dict[str, Dict]:
+        """Season analysis for every manager, including league-wide metrics"""
+        played = self.played
+        games = played.sum(axis=1)
+        wins = (self.won & played).sum(axis=1)
+        losses = games - wins
+        total_actual = np.nansum(self.actual, axis=1)
+        total_optimal = np.nansum(self.optimal, axis=1)
+        total_against = np.nansum(self.points_against, axis=1)
         
-        users = await analytics.sleeper_api.get_users(league_id)
-        print(f"Users fetched: {len(users)} users")
+        # All-play: each week every team plays every other team that played
+        points = np.where(played, self.points_for, np.nan)
+        with np.errstate(invalid='ignore'):
+            beats = points[:, None, :] > points[None, :, :]
+            loses_to = points[:, None, :] < points[None, :, :]
+        all_play_wins = beats.sum(axis=(1, 2))
+        all_play_losses = loses_to.sum(axis=(1, 2))
+        opponents_per_week = np.maximum(played.sum(axis=0) - 1, 1)
+        expected_wins = np.where(played, beats.sum(axis=1) / opponents_per_week, 0).sum(axis=1)
+        
+        # Median: a win for scoring above the league median that week
+        with np.errstate(invalid='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            weekly_median = np.nanmedian(points, axis=0)
+            median_wins = (points > weekly_median[None, :]).sum(axis=1)
+            std_dev = np.nanstd(points, axis=1)
         
-        # Fetch player data for name lookups
-        players_data = await analytics.sleeper_api.get_players()
-        print(f"Players data fetched: {len(players_data)} players")
-        if players_data:
-            sample_player_id = list(players_data.keys())[0]
-            sample_player = players_data[sample_player_id]
-            print(f"Sample player data: {sample_player_id} -> {sample_player.get('first_name', '')} {sample_player.get('last_name', '')}")
-        analytics.set_players_data(players_data)
+        safe_games = np.maximum(games, 1)
+        all_play_games = np.maximum(all_play_wins + all_play_losses, 1)
         
-        # Extract roster settings from league data
-        roster_settings = {}
-        if 'roster_positions' in league:
-            roster_positions = league['roster_positions']
-            roster_settings = {
-                'qb': roster_positions.count('QB'),
-                'rb': roster_positions.count('RB'),
-                'wr': roster_positions.count('WR'),
-                'te': roster_positions.count('TE'),
-                'k': roster_positions.count('K'),
-                'def': roster_positions.count('DEF'),
-                'flex': roster_positions.count('FLEX')
+        summaries = {}
+        for i, user_id in enumerate(self.user_ids):
+            n = int(games[i])
+            summaries[user_id] = {
+                'total_weeks': n,
+                'wins': int(wins[i]),
+                'losses': int(losses[i]),
+                'win_percentage': float(wins[i] / safe_games[i]) if n else 0,
+                'total_actual_points': float(total_actual[i]),
+                'total_optimal_points': float(total_optimal[i]),
+                'points_lost_to_suboptimal_lineups': float(total_optimal[i] - total_actual[i]),
+                'average_actual_points': float(total_actual[i] / safe_games[i]) if n else 0,
+                'average_optimal_points': float(total_optimal[i] / safe_games[i]) if n else 0,
+                'total_points_against': float(total_against[i]),
+                'all_play_wins': int(all_play_wins[i]),
+                'all_play_losses': int(all_play_losses[i]),
+                'all_play_win_percentage': float(all_play_wins[i] / all_play_games[i]) if n else 0,
+                'median_wins': int(median_wins[i]),
+                'median_losses': n - int(median_wins[i]),
+                'expected_wins': float(expected_wins[i]),
+                'luck': float(wins[i] - expected_wins[i]),
+                'points_std_dev': float(std_dev[i]) if n else 0,
+                'weekly_data': self.season_data[user_id]
             }
-            print(f"Roster settings: {roster_settings}")
-        analytics.set_roster_settings(roster_settings)
+        return summaries
+
+class PlayoffSimulator:
+    """Monte Carlo rest-of-season simulation for playoff, bye and seed odds.
+    
+    Each team's weekly score is a normal distribution fitted to its completed
+    weeks, with mean and variance shrunk toward the league's while few weeks
+    have been played. All remaining matchups are played out for every simulated
+    season at once with NumPy, and standings rank teams by wins, then points
+    for (Sleeper's default tiebreaker). Divisions are not modeled.
+    """
+    
+    PRIOR_WEEKS = 3
+    CHUNK = 25000
+    
+    def __init__(self, user_ids: List[str], wins: np.ndarray, points_for: np.ndarray,
+                 history: np.ndarray, schedule: List[List[tuple]], playoff_teams: int, byes: int):
+        self.user_ids = list(user_ids)
+        self.wins = wins.astype(float)
+        self.points_for = points_for.astype(float)
+        self.schedule = schedule
+        self.playoff_teams = min(playoff_teams, len(self.user_ids))
+        self.byes = min(byes, self.playoff_teams)
         
-        # Get current week and season
-        current_week = league.get('settings', {}).get('leg', 1)
-        season = str(league.get('season', '2023'))  # Convert to string and use actual season
-        print(f"Current week: {current_week}, Season: {season}")
+        played = ~np.isnan(history)
+        counts = played.sum(axis=1)
+        league_mean = float(np.nanmean(history)) if played.any() else 0.0
+        league_var = float(np.nanvar(history)) if played.sum() > 1 else 1.0
+        with np.errstate(invalid='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            team_mean = np.where(counts > 0, np.nanmean(history, axis=1), league_mean)
+            team_var = np.where(counts > 1, np.nanvar(history, axis=1), league_var)
+        prior = self.PRIOR_WEEKS
+        self.means = (counts * team_mean + prior * league_mean) / (counts + prior)
+        self.stds = np.sqrt((counts * team_var + prior * league_var) / (counts + prior))
+    
+    @classmethod
+    def from_season(cls, matrix: SeasonMatrix, user_ids: List[str], completed_weeks: List[int],
+                    schedule: List[List[tuple]], playoff_teams: int) -> "PlayoffSimulator":
+        """Standings and score history of `user_ids` from the completed regular-season weeks.
         
-        # Fetch data for all weeks
-        all_matchups = []
-        all_rosters = []
-        all_player_stats = []
+        `schedule` holds each remaining week's matchups as pairs of indexes into `user_ids`.
+        """
+        rows = [matrix.user_ids.index(user_id) for user_id in user_ids]
+        completed = np.isin(matrix.weeks, completed_weeks)
+        played = matrix.played[rows] & completed[None, :]
+        history = np.where(played, matrix.points_for[rows], np.nan)
+        wins = (matrix.won[rows] & played).sum(axis=1)
+        points_for = np.nansum(history, axis=1)
+        # Playoff brackets are padded to a power of two with first-round byes
+        bracket = 1 << max(playoff_teams - 1, 0).bit_length()
+        return cls(user_ids, wins, points_for, history, schedule, playoff_teams, bracket - playoff_teams)
+    
+    def simulate(self, simulations: int = PLAYOFF_SIMULATIONS, seed: Optional[int] = None) -> Dict:
+        """Play out the remaining schedule `simulations` times and tally the final standings"""
+        teams = len(self.user_ids)
+        rng = np.random.default_rng(seed)
+        if not self.schedule:
+            simulations = 1  # standings are final
+        # Per remaining week: each team's opponent (itself when idle) and who plays
+        weeks = []
+        for pairs in self.schedule:
+            if not pairs:
+                continue
+            opponent = np.arange(teams)
+            for i, j in pairs:
+                opponent[i], opponent[j] = j, i
+            weeks.append((opponent, (opponent != np.arange(teams)).astype(float)))
+        seed_counts = np.zeros((teams, teams))
+        total_wins = np.zeros(teams)
+        total_points = np.zeros(teams)
         
-        for week in range(1, current_week + 1):
-            print(f"Fetching data for week {week}")
-            matchups = await analytics.sleeper_api.get_matchups(league_id, week)
-            rosters = await analytics.sleeper_api.get_rosters(league_id)
-            player_stats = await analytics.sleeper_api.get_player_stats(week, season)
+        for start in range(0, simulations, self.CHUNK):
+            size = min(self.CHUNK, simulations - start)
+            wins = np.tile(self.wins, (size, 1))
+            points = np.tile(self.points_for, (size, 1))
+            for opponent, playing in weeks:
+                scores = rng.normal(self.means, self.stds, size=(size, teams)) * playing
+                wins += scores > scores[:, opponent]
+                points += scores
             
-            # Debug: Check what we're getting
-            if week == 1 and rosters:
-                sample_roster = rosters[0]
-                print(f"    Sample roster keys: {list(sample_roster.keys())}")
-                print(f"    Starters: {sample_roster.get('starters', [])[:3]}...")  # First 3 starters
-                print(f"    Starters points: {sample_roster.get('starters_points', [])[:3]}...")  # First 3 points
-                print(f"    Players: {len(sample_roster.get('players', []))}")
-            
-            all_matchups.append(matchups)
-            all_rosters.append(rosters)
-            all_player_stats.append(player_stats)
-        
-        print(f"Data fetched for {len(all_matchups)} weeks")
+            # Rank by wins, then points for; order[:, rank] is the team finishing at that rank
+            order = np.argsort(-(wins * 1e7 + points), axis=1, kind='stable')
+            seed_counts += np.bincount((order * teams + np.arange(teams)).ravel(),
+                                       minlength=teams * teams).reshape(teams, teams)
+            total_wins += wins.sum(axis=0)
+            total_points += points.sum(axis=0)
         
-        # Analyze each manager
-        manager_analytics = {}
-        for user in users:
-            user_id = user['user_id']
-            print(f"Analyzing user: {user.get('display_name', 'Unknown')}")
-            season_analysis = analytics.analyze_season_performance(
-                user_id, all_matchups, all_rosters, all_player_stats
-            )
-            
-            manager_analytics[user_id] = {
-                'user_info': user,
-                'season_analysis': season_analysis
+        seed_probabilities = seed_counts / simulations
+        return {
+            'simulations': simulations,
+            'seed': seed,
+            'playoff_teams': self.playoff_teams,
+            'byes': self.byes,
+            'remaining_weeks': len(weeks),
+            'teams': {
+                user_id: {
+                    'playoff_probability': round(float(seed_probabilities[i, :self.playoff_teams].sum()), 4),
+                    'bye_probability': round(float(seed_probabilities[i, :self.byes].sum()), 4),
+                    'seed_probabilities': [round(float(p), 4) for p in seed_probabilities[i, :self.playoff_teams]],
+                    'projected_wins': round(float(total_wins[i] / simulations), 2),
+                    'projected_points_for': round(float(total_points[i] / simulations), 2)
+                }
+                for i, user_id in enumerate(self.user_ids)
             }
-        
-        print("Analysis completed successfully")
+        }
+
+class AnalysisJob:
+    """A queued league analysis shared by every request that asked for it.
+    
+    Progress events are kept and fanned out to subscribers, so a stream that
+    joins late (or after the job finished) replays everything it missed.
+    """
+    
+    def __init__(self, league_id: str, refresh: bool):
+        self.id = uuid.uuid4().hex
+        self.league_id = league_id
+        self.refresh = refresh
+        self.status = 'queued'
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.error_status = 500
+        self.done = asyncio.Event()
+        self.events: List[Dict] = []
+        self._subscribers: List[asyncio.Queue] = []
+        self._etag: Optional[str] = None
+    
+    def emit(self, event: Dict):
+        """Record an event and pass it to every current subscriber"""
+        self.events.append(event)
+        for queue in self._subscribers:
+            queue.put_nowait(event)
+    
+    async def subscribe(self):
+        """Yield the job's events from the start, ending with a done or error event"""
+        queue: asyncio.Queue = asyncio.Queue()
+        for event in self.events:
+            queue.put_nowait(event)
+        self._subscribers.append(queue)
+        try:
+            while True:
+                event = await queue.get()
+                yield event
+                if event['type'] in ('done', 'error'):
+                    return
+        finally:
+            self._subscribers.remove(queue)
+    
+    @property
+    def etag(self) -> Optional[str]:
+        """Content hash of the result, computed once on first use"""
+        if self._etag is None and self.result is not None:
+            self._etag = content_etag(self.result)
+        return self._etag
+    
+    def to_dict(self) -> Dict:
         return {
-            'league': league,
-            'users': users,
-            'manager_analytics': manager_analytics,
-            'current_week': current_week,
-            'season': season
+            'job_id': self.id,
+            'league_id': self.league_id,
+            'status': self.status,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'error': self.error
         }
+
+class AnalysisJobQueue:
+    """Bounded worker pool for league analyses with single-flight deduplication.
+    
+    Submitting a league that is already queued or running returns the existing
+    job, and a finished job is reused until its result expires after `result_ttl`
+    seconds (unless a refresh is requested). Bursts wait in a bounded queue
+    instead of all running on the event loop at once. `runner(league_id,
+    refresh, emit)` receives the job's emit for progress events.
+    """
+    
+    def __init__(self, runner: Callable, workers: int = JOB_WORKERS,
+                 max_queued: int = JOB_QUEUE_MAX, result_ttl: float = JOB_RESULT_TTL):
+        self.runner = runner
+        self.workers = workers
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self.jobs: Dict[str, AnalysisJob] = {}
+        self._by_league: Dict[str, str] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+    
+    def start(self):
+        """Start the worker tasks on the running event loop"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(max(1, self.workers))]
     
-    except Exception as e:
-        print(f"Error analyzing league: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+    
+    def _purge_expired(self):
+        now = time.time()
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job.finished_at is not None and now - job.finished_at > self.result_ttl]
+        for job_id in expired:
+            job = self.jobs.pop(job_id)
+            if self._by_league.get(job.league_id) == job_id:
+                del self._by_league[job.league_id]
+    
+    def _existing(self, league_id: str, refresh: bool) -> Optional[AnalysisJob]:
+        """The queued, running or still fresh job a submit for this league would join"""
+        existing = self.jobs.get(self._by_league.get(league_id, ''))
+        if existing is not None and (not existing.done.is_set() or (existing.status == 'done' and not refresh)):
+            return existing
+        return None
+    
+    def submit(self, league_id: str, refresh: bool = False) -> AnalysisJob:
+        """Queue an analysis, or return the job already covering this league"""
+        self.start()
+        self._purge_expired()
+        
+        existing = self._existing(league_id, refresh)
+        if existing is not None:
+            return existing
+        
+        job = AnalysisJob(league_id, refresh)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail="Too many analyses queued, try again shortly")
+        self.jobs[job.id] = job
+        self._by_league[league_id] = job.id
+        return job
+    
+    def submit_many(self, league_ids: List[str], refresh: bool = False) -> Dict[str, AnalysisJob]:
+        """Submit several leagues, all or none: 503 before queuing any if they do not all fit"""
+        self.start()
+        self._purge_expired()
+        new = [league_id for league_id in league_ids if self._existing(league_id, refresh) is None]
+        if len(new) > self.max_queued - self._queue.qsize():
+            raise HTTPException(status_code=503, detail="Too many analyses queued, try again shortly")
+        return {league_id: self.submit(league_id, refresh) for league_id in league_ids}
+    
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        self._purge_expired()
+        return self.jobs.get(job_id)
+    
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            set_log_context(request_id=job.id[:12], league_id=job.league_id)
+            job.status = 'running'
+            try:
+                job.result = await self.runner(job.league_id, job.refresh, job.emit)
+                job.status = 'done'
+                job.emit({'type': 'done'})
+            except Exception as e:
+                if isinstance(e, HTTPException) and e.status_code < 500:
+                    # A client error (unknown league, bad input), not a server fault
+                    logger.warning("Analysis job %s failed: %s", job.id, e.detail)
+                else:
+                    logger.exception("Analysis job %s failed: %s", job.id, e)
+                job.error = getattr(e, 'detail', None) or str(e)
+                job.error_status = getattr(e, 'status_code', 500)
+                job.status = 'failed'
+                job.emit({'type': 'error', 'detail': job.error})
+            finally:
+                job.finished_at = time.time()
+                job.done.set()
+                self._queue.task_done()
 
-@app.get("/league/{league_id}")
-async def get_league_data(league_id: str):
-    """Get basic league information"""
+# Initialize analytics engine
+analytics = FantasyAnalytics()
+player_db = PlayerDatabase()
+stats_cache = PlayerStatsCache()
+league_cache = LeagueAnalysisCache()
+league_info_cache = PayloadCache()
+history_store = HistoryStore()
+analysis_executor = AnalysisExecutor()
+job_queue = AnalysisJobQueue(lambda league_id, refresh, emit: run_league_analysis(league_id, refresh, emit))
+
+def dumps_json(payload) -> bytes:
+    """Encode a response payload compactly, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+
+def content_etag(payload) -> str:
+    """Weak ETag from a hash of the payload's canonical (key-sorted) JSON"""
+    if orjson is not None:
+        data = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        data = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+    return f'W/"{hashlib.blake2b(data, digest_size=16).hexdigest()}"'
+
+def variant_etag(etag: str, sections: Optional[tuple]) -> str:
+    """ETag of one representation (full or a compact section selection) of a payload"""
+    if sections is None:
+        return etag
+    return f'{etag[:-1]}-{".".join(sections)}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match lists `etag` (weak comparison); only GET and HEAD are answered with 304"""
+    header = request.headers.get("if-none-match")
+    if not header or request.method not in ("GET", "HEAD"):
+        return False
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip() == "*" or tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+def cached_json_response(request: Request, etag: str, build: Callable[[], Dict], cache: str) -> Response:
+    """304 when the client already has `etag`, otherwise the JSON from `build()` with caching headers"""
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={HTTP_CACHE_MAX_AGE}", "Vary": "Accept-Encoding"}
+    if etag_matches(request, etag):
+        CACHE_REQUESTS.inc(cache=cache, result="hit")
+        return Response(status_code=304, headers=headers)
+    CACHE_REQUESTS.inc(cache=cache, result="miss")
+    return json_response(request, build(), headers=headers)
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, or None for identity"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+    for encoding in (("br",) if brotli is not None else ()) + ("gzip",):
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+def _compressor(encoding: str):
+    if encoding == "br":
+        return brotli.Compressor(quality=5)
+    return zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 writes a gzip container
+
+def json_response(request: Request, payload, status_code: int = 200,
+                  headers: Optional[Dict[str, str]] = None) -> Response:
+    """Fast-encoded JSON response, compressed as the client's Accept-Encoding allows"""
+    body = dumps_json(payload)
+    headers = {"Vary": "Accept-Encoding", **(headers or {})}
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    if encoding and len(body) >= RESPONSE_COMPRESS_MIN_BYTES:
+        compressor = _compressor(encoding)
+        body = (compressor.process(body) + compressor.finish() if encoding == "br"
+                else compressor.compress(body) + compressor.flush())
+        headers["Content-Encoding"] = encoding
+    return Response(body, status_code=status_code, headers=headers, media_type="application/json")
+
+async def compress_stream(chunks, encoding: Optional[str]):
+    """Compress a streamed body, flushing after every chunk so events are not held back"""
+    if encoding is None:
+        async for chunk in chunks:
+            yield chunk
+        return
+    compressor = _compressor(encoding)
+    async for chunk in chunks:
+        if encoding == "br":
+            yield compressor.process(chunk) + compressor.flush()
+        else:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.finish() if encoding == "br" else compressor.flush()
+
+COMPACT_SECTIONS = ('league', 'managers', 'weekly', 'improvements', 'players')
+COMPACT_WEEKLY_FIELDS = ('week', 'actual_points', 'optimal_points', 'points_for', 'points_against', 'result')
+LEAGUE_SUMMARY_FIELDS = ('league_id', 'name', 'season', 'status', 'total_rosters', 'roster_positions',
+                         'scoring_settings', 'previous_league_id')
+
+def parse_compact_fields(fields: str) -> tuple:
+    """Sections requested with `fields` ("summary" is league and managers); all when empty"""
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    if not requested:
+        return COMPACT_SECTIONS
+    sections = []
+    for field in requested:
+        expanded = ('league', 'managers') if field == 'summary' else (field,)
+        for section in expanded:
+            if section not in COMPACT_SECTIONS:
+                raise HTTPException(status_code=400, detail=f"Unknown field {field!r}; choose from summary, "
+                                                            f"{', '.join(COMPACT_SECTIONS)}")
+            if section not in sections:
+                sections.append(section)
+    return tuple(sections)
+
+def compact_analysis(result: Dict, sections: tuple = COMPACT_SECTIONS) -> Dict:
+    """Smaller form of the /analyze payload.
+    
+    Players are listed once in `players` (id -> [name, position]) and referenced
+    by id, weekly series and improvements are columnar lists per manager, and
+    the raw league object is trimmed to the fields the dashboard uses.
+    """
+    compact = {'current_week': result['current_week'], 'season': result['season']}
+    if 'league' in sections:
+        compact['league'] = {field: result['league'].get(field) for field in LEAGUE_SUMMARY_FIELDS}
+    if 'managers' in sections:
+        compact['managers'] = [
+            {
+                'user_id': user_id,
+                'display_name': manager['user_info'].get('display_name'),
+                'team_name': (manager['user_info'].get('metadata') or {}).get('team_name'),
+                'avatar': manager['user_info'].get('avatar'),
+                'summary': {key: value for key, value in manager['season_analysis'].items() if key != 'weekly_data'},
+                'playoff_odds': ((result.get('playoff_odds') or {}).get('teams') or {}).get(user_id)
+            }
+            for user_id, manager in result['manager_analytics'].items()
+        ]
+    
+    players = {}
+    weekly, improvements = {}, {}
+    for user_id, manager in result['manager_analytics'].items():
+        weeks = manager['season_analysis'].get('weekly_data', [])
+        weekly[user_id] = {field: [week.get(field) for week in weeks] for field in COMPACT_WEEKLY_FIELDS}
+        columns = improvements[user_id] = {'week': [], 'slot': [], 'replaced': [], 'replaced_points': [],
+                                           'with': [], 'with_points': []}
+        for week in weeks:
+            for improvement in week.get('improvements', []):
+                replaced, started = improvement['replaced'], improvement['with']
+                columns['week'].append(week['week'])
+                columns['slot'].append(started.get('slot'))
+                columns['replaced'].append(replaced['player_id'])
+                columns['replaced_points'].append(replaced['points'])
+                columns['with'].append(started['player_id'])
+                columns['with_points'].append(started['points'])
+                for player in (replaced, started):
+                    players.setdefault(player['player_id'], [player.get('name'), player.get('position')])
+    
+    if 'weekly' in sections:
+        compact['weekly'] = weekly
+    if 'improvements' in sections:
+        compact['improvements'] = improvements
+    if 'players' in sections:
+        compact['players'] = players
+    return compact
+
+def response_sections(format: str = "full", fields: str = "") -> Optional[tuple]:
+    """Compact sections requested by `format` and `fields`, or None for the full payload"""
+    if format not in ("full", "compact"):
+        raise HTTPException(status_code=400, detail="format must be full or compact")
+    if format == "full" and not fields:
+        return None
+    return parse_compact_fields(fields)
+
+def format_analysis(result: Dict, sections: Optional[tuple]) -> Dict:
+    return result if sections is None else compact_analysis(result, sections)
+
+@app.middleware("http")
+async def request_context_middleware(request: Request, call_next):
+    """Tag every log line of a request with its request id and time the request"""
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:12]
+    token = log_context.set({'request_id': request_id})
+    started = time.perf_counter()
     try:
+        response = await call_next(request)
+    finally:
+        log_context.reset(token)
+    route = request.scope.get("route")
+    HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started,
+                                 route=getattr(route, "path", "unmatched"), method=request.method,
+                                 status=response.status_code)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+@app.get("/", response_class=HTMLResponse)
+async def home(request: Request):
+    """Main dashboard page"""
+    return templates.TemplateResponse("index.html", {"request": request})
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus metrics for upstream calls, caches and analysis stages"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def remaining_regular_weeks(league: Dict, current_week: int) -> List[int]:
+    """Regular-season weeks from the in-progress one on, empty once the regular season is over"""
+    last_regular_week = ((league.get('settings') or {}).get('playoff_week_start') or 15) - 1
+    if league.get('status') == 'complete':
+        return []
+    return list(range(current_week, last_regular_week + 1))
+
+async def project_playoff_odds(league_id: str, league: Dict, current_week: int, rosters: List[Dict],
+                               matrix: SeasonMatrix, matchups_by_week: Dict[int, List[Dict]]) -> Optional[Dict]:
+    """Simulate the rest of the regular season for playoff, bye and seed probabilities.
+    
+    The in-progress week and every later regular-season week are simulated;
+    pairings come from `matchups_by_week` (the ingested weeks) or Sleeper's
+    pre-generated matchups for later weeks. Returns None when the regular
+    season is over. The RNG seed is PLAYOFF_SEED or derived from the league
+    and week, so unchanged inputs give identical odds (and ETags).
+    """
+    remaining = remaining_regular_weeks(league, current_week)
+    if not remaining:
+        return None
+    completed = list(range(1, current_week))
+    playoff_teams = (league.get('settings') or {}).get('playoff_teams') or 6
+    
+    future = [week for week in remaining if week not in matchups_by_week]
+    fetched = await asyncio.gather(*(analytics.sleeper_api.get_matchups(league_id, week) for week in future))
+    matchups_by_week = {**matchups_by_week, **dict(zip(future, fetched))}
+    
+    owners = {roster['roster_id']: roster['owner_id'] for roster in rosters if roster.get('owner_id')}
+    user_ids = [user_id for user_id in matrix.user_ids if user_id in set(owners.values())]
+    index = {user_id: i for i, user_id in enumerate(user_ids)}
+    schedule = []
+    for week in remaining:
+        games: Dict[int, List[int]] = {}
+        for matchup in matchups_by_week.get(week) or []:
+            user_id = owners.get(matchup.get('roster_id'))
+            if matchup.get('matchup_id') is not None and user_id in index:
+                games.setdefault(matchup['matchup_id'], []).append(index[user_id])
+        schedule.append([tuple(teams) for teams in games.values() if len(teams) == 2])
+    
+    simulator = PlayoffSimulator.from_season(matrix, user_ids, completed, schedule, playoff_teams)
+    seed = int(PLAYOFF_SEED) if PLAYOFF_SEED else zlib.crc32(f"{league_id}:{current_week}".encode())
+    return await analysis_executor.run(simulator.simulate, PLAYOFF_SIMULATIONS, seed)
+
+async def run_league_analysis(league_id: str, refresh: bool = False,
+                              emit: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """Fetch and analyze a league, returning the full /analyze payload.
+    
+    When `emit` is given it receives events as the analysis progresses: the
+    league info first, ingestion progress, one event per manager, then the
+    playoff odds.
+    """
+    def send(event: Dict):
+        if emit is not None:
+            emit(event)
+    
+    started = time.perf_counter()
+    logger.info("Analyzing league")
+    
+    # Fetch league data
+    with STAGE_SECONDS.time(stage="league"):
         league = await analytics.sleeper_api.get_league(league_id)
         users = await analytics.sleeper_api.get_users(league_id)
-        return {
+    logger.debug("League %r fetched with %d users", league.get('name', 'Unknown'), len(users))
+    
+    # Get current week and season
+    current_week = league.get('settings', {}).get('leg', 1)
+    season = str(league.get('season', '2023'))  # Convert to string and use actual season
+    send({'type': 'league', 'league': league, 'users': users, 'current_week': current_week, 'season': season})
+    
+    # Player index for name lookups (cached on disk, refreshed once per TTL)
+    with STAGE_SECONDS.time(stage="players"):
+        players_data = await player_db.get(analytics.sleeper_api)
+    logger.debug("Player index has %d players", len(players_data))
+    
+    # Immutable per-league inputs (player index, roster slots) for the engine
+    context = LeagueContext.from_league(league, players_data)
+    logger.debug("Roster positions: %s", league.get('roster_positions'))
+    
+    # Completed weeks analyzed by an earlier request (or stored before a restart) are reused as-is
+    if refresh:
+        league_cache.invalidate(league_id)
+        await history_store.invalidate(league_id)
+    cached_weeks = league_cache.completed_weeks(league_id, league)
+    if not cached_weeks and not refresh:
+        cached_weeks = await history_store.completed_weeks(league_id, league)
+        for week, entries in cached_weeks.items():
+            league_cache.store_week(league_id, league, week, entries)
+    start_week = league_cache.completed_through(cached_weeks) + 1
+    CACHE_REQUESTS.inc(start_week - 1, cache="league_weeks", result="hit")
+    CACHE_REQUESTS.inc(max(current_week - start_week + 1, 0), cache="league_weeks", result="miss")
+    
+    # Fetch data for the remaining weeks concurrently (none once a finished season is memoized)
+    all_matchups, all_rosters, all_player_stats = [], [], []
+    rosters: Optional[List[Dict]] = None
+    if start_week <= current_week:
+        logger.info("Season %s: fetching weeks %d-%d (%d weeks memoized)",
+                    season, start_week, current_week, start_week - 1)
+        with STAGE_SECONDS.time(stage="ingest"):
+            rosters = await analytics.sleeper_api.get_rosters(league_id)
+            all_matchups, all_rosters, all_player_stats = await ingest_weeks(
+                analytics.sleeper_api, league_id, season, current_week,
+                stats_cache=stats_cache, start_week=start_week,
+                on_progress=lambda completed, total: send(
+                    {'type': 'progress', 'stage': 'ingest', 'completed': completed, 'total': total}),
+                stat_fields=league_stat_fields(league), rosters=rosters
+            )
+    else:
+        logger.info("Season %s: all %d weeks memoized", season, current_week)
+    
+    # Analyze every manager's new weeks in one pass over the indexed season
+    send({'type': 'progress', 'stage': 'analyze', 'completed': 0, 'total': len(users)})
+    with STAGE_SECONDS.time(stage="analyze_weeks"):
+        new_weekly_data = await analysis_executor.analyze_weeks(
+            context, all_matchups, all_rosters, all_player_stats, start_week, [user['user_id'] for user in users]
+        )
+    
+    # Merge the new weeks with the memoized ones
+    season_data = {}
+    new_weeks = {week: {} for week in range(start_week, current_week + 1)}
+    for user in users:
+        user_id = user['user_id']
+        for entry in new_weekly_data[user_id]:
+            new_weeks[entry['week']][user_id] = entry
+        
+        season_data[user_id] = [cached_weeks[week][user_id] for week in range(1, start_week)
+                                if user_id in cached_weeks[week]]
+        season_data[user_id].extend(new_weekly_data[user_id])
+    
+    # Season totals and league-wide metrics for every manager at once
+    with STAGE_SECONDS.time(stage="season_summary"):
+        season_matrix = SeasonMatrix(season_data, range(1, current_week + 1))
+        season_summaries = season_matrix.summaries()
+    manager_analytics = {}
+    for user in users:
+        manager_analytics[user['user_id']] = {
+            'user_info': user,
+            'season_analysis': season_summaries[user['user_id']]
+        }
+        send({'type': 'manager', 'user_id': user['user_id'], 'analytics': manager_analytics[user['user_id']]})
+    
+    # Forward-looking standings projections
+    playoff_odds = None
+    if PLAYOFF_SIMULATIONS > 0 and remaining_regular_weeks(league, current_week):
+        with STAGE_SECONDS.time(stage="playoff_odds"):
+            playoff_odds = await project_playoff_odds(
+                league_id, league, current_week,
+                rosters if rosters is not None else await analytics.sleeper_api.get_rosters(league_id),
+                season_matrix, {start_week + i: matchups for i, matchups in enumerate(all_matchups)})
+        send({'type': 'playoff_odds', 'playoff_odds': playoff_odds})
+    
+    # Memoize and persist the weeks that are over; the current week may still change.
+    # A week with no analyses (empty matchups upstream) is fetched again next time.
+    complete = league.get('status') == 'complete'
+    final_weeks = {week: entries for week, entries in new_weeks.items()
+                   if entries and (week < current_week or complete)}
+    for week, entries in final_weeks.items():
+        league_cache.store_week(league_id, league, week, entries)
+    with STAGE_SECONDS.time(stage="history"):
+        await history_store.record(
+            league, users, {week: all_matchups[week - start_week] for week in final_weeks}, final_weeks, complete)
+    
+    elapsed = time.perf_counter() - started
+    STAGE_SECONDS.observe(elapsed, stage="total")
+    logger.info("Analysis completed in %.3fs", elapsed)
+    return {
+        'league': league,
+        'users': users,
+        'manager_analytics': manager_analytics,
+        'playoff_odds': playoff_odds,
+        'current_week': current_week,
+        'season': season
+    }
+
+async def finished_analysis(league_id: str, refresh: bool = False) -> AnalysisJob:
+    """Wait for the league's shared analysis job (identical concurrent requests share one)"""
+    job = job_queue.submit(league_id, refresh)
+    await job.done.wait()
+    if job.status == 'failed':
+        raise HTTPException(status_code=job.error_status, detail=job.error)
+    return job
+
+@app.post("/analyze")
+async def analyze_league(request: Request, league_id: str = Form(...), refresh: bool = Form(False),
+                         format: str = Form("full"), fields: str = Form("")):
+    """Analyze a league and return comprehensive analytics
+    
+    `format=compact` (or any `fields` selection) returns the smaller compact
+    form; see compact_analysis.
+    """
+    set_log_context(league_id=league_id)
+    sections = response_sections(format, fields)
+    job = await finished_analysis(league_id, refresh)
+    # Conditional requests do not apply to POST; pollers revalidate with GET /analyze/{league_id}
+    with STAGE_SECONDS.time(stage="encode"):
+        return json_response(request, format_analysis(job.result, sections),
+                             headers={"ETag": variant_etag(job.etag, sections)})
+
+@app.get("/analyze/{league_id}")
+async def get_league_analysis(request: Request, league_id: str, format: str = "full", fields: str = ""):
+    """Pollable analysis of a league: the shared job's result, revalidated with If-None-Match
+    
+    Runs the analysis if no recent one exists. Takes the same `format` and
+    `fields` as POST /analyze.
+    """
+    set_log_context(league_id=league_id)
+    sections = response_sections(format, fields)
+    job = await finished_analysis(league_id)
+    with STAGE_SECONDS.time(stage="encode"):
+        return cached_json_response(request, variant_etag(job.etag, sections),
+                                    lambda: format_analysis(job.result, sections), cache="http_analyze")
+
+@app.post("/jobs", status_code=202)
+async def submit_analysis_job(league_id: str = Form(...), refresh: bool = Form(False)):
+    """Queue a league analysis and return its job id"""
+    job = job_queue.submit(league_id, refresh)
+    return job.to_dict()
+
+@app.get("/jobs/{job_id}")
+async def get_analysis_job(job_id: str):
+    """Status of a queued analysis"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.get("/jobs/{job_id}/result")
+async def get_analysis_job_result(request: Request, job_id: str, format: str = "full", fields: str = ""):
+    """Result of a finished analysis (202 while it is still queued or running)"""
+    sections = response_sections(format, fields)
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status == 'failed':
+        raise HTTPException(status_code=job.error_status, detail=job.error)
+    if job.status != 'done':
+        return JSONResponse(job.to_dict(), status_code=202)
+    return cached_json_response(request, variant_etag(job.etag, sections),
+                                lambda: format_analysis(job.result, sections), cache="http_analyze")
+
+async def stream_league_analysis(league_id: str, refresh: bool = False):
+    """Yield analysis events as newline-delimited JSON while the league is analyzed.
+    
+    Streams go through the job queue like /analyze: concurrent viewers of a
+    league share one analysis, and a recently finished one is replayed. The
+    job keeps running if the client disconnects, since others may be watching.
+    """
+    set_log_context(league_id=league_id)
+    try:
+        job = job_queue.submit(league_id, refresh)
+    except HTTPException as e:
+        yield dumps_json({'type': 'error', 'detail': e.detail}) + b"\n"
+        return
+    async for event in job.subscribe():
+        yield dumps_json(event) + b"\n"
+
+@app.post("/analyze/stream")
+async def analyze_league_stream(request: Request, league_id: str = Form(...), refresh: bool = Form(False)):
+    """Analyze a league, streaming results as NDJSON events
+    
+    Events: league (league info and users), progress (ingestion and analysis),
+    manager (one manager's analytics), playoff_odds, then done or error.
+    """
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    headers = {"Vary": "Accept-Encoding", **({"Content-Encoding": encoding} if encoding else {})}
+    return StreamingResponse(compress_stream(stream_league_analysis(league_id, refresh), encoding),
+                             media_type="application/x-ndjson", headers=headers)
+
+def summarize_leagues(results: Dict[str, Dict]) -> Dict:
+    """Cross-league totals for every manager appearing in the analyzed leagues"""
+    managers = {}
+    for league_id, result in results.items():
+        for user_id, manager in result['manager_analytics'].items():
+            season_analysis = manager['season_analysis']
+            summary = managers.setdefault(user_id, {
+                'display_name': manager['user_info'].get('display_name'),
+                'leagues': [],
+                'wins': 0,
+                'losses': 0,
+                'total_weeks': 0,
+                'total_actual_points': 0,
+                'total_optimal_points': 0,
+                'points_lost_to_suboptimal_lineups': 0,
+                'luck': 0
+            })
+            summary['leagues'].append(league_id)
+            for field in ('wins', 'losses', 'total_weeks', 'total_actual_points', 'total_optimal_points',
+                          'points_lost_to_suboptimal_lineups', 'luck'):
+                summary[field] += season_analysis.get(field, 0)
+    
+    for summary in managers.values():
+        games = summary['wins'] + summary['losses']
+        summary['win_percentage'] = summary['wins'] / games if games else 0
+        summary['average_actual_points'] = (summary['total_actual_points'] / summary['total_weeks']
+                                            if summary['total_weeks'] else 0)
+    return managers
+
+async def run_batch_analysis(league_ids: List[str], refresh: bool = False) -> Dict:
+    """Analyze several leagues concurrently through the shared job queue.
+    
+    The player index and weekly stats caches are process-wide, so leagues in the
+    same season download each week's stats once between them.
+    """
+    league_ids = list(dict.fromkeys(league_ids))
+    jobs = job_queue.submit_many(league_ids, refresh)
+    await asyncio.gather(*(job.done.wait() for job in jobs.values()))
+    
+    results = {league_id: job.result for league_id, job in jobs.items() if job.status == 'done'}
+    errors = {league_id: job.error for league_id, job in jobs.items() if job.status != 'done'}
+    leagues = {
+        league_id: {
+            'name': result['league'].get('name'),
+            'season': result['season'],
+            'current_week': result['current_week'],
+            'teams': len(result['users'])
+        }
+        for league_id, result in results.items()
+    }
+    return {
+        'results': results,
+        'errors': errors,
+        'summary': {
+            'leagues': leagues,
+            'league_count': len(results),
+            'failed_count': len(errors),
+            'managers': summarize_leagues(results)
+        }
+    }
+
+@app.post("/analyze/batch")
+async def analyze_batch(request: Request, league_ids: List[str] = Form([]), user_id: Optional[str] = Form(None),
+                        season: Optional[str] = Form(None), refresh: bool = Form(False),
+                        format: str = Form("full"), fields: str = Form("")):
+    """Analyze many leagues at once
+    
+    Pass one or more `league_ids` fields, or a Sleeper `user_id` and `season`
+    to analyze every NFL league that user is in. `format` and `fields` apply
+    to each league's result as in /analyze.
+    """
+    sections = response_sections(format, fields)
+    league_ids = list(league_ids or [])
+    if user_id:
+        if not season:
+            raise HTTPException(status_code=400, detail="season is required with user_id")
+        user_leagues = await analytics.sleeper_api.get_user_leagues(user_id, season)
+        league_ids.extend(league['league_id'] for league in user_leagues)
+    if not league_ids:
+        raise HTTPException(status_code=400, detail="Provide league_ids or user_id and season")
+    if len(set(league_ids)) > JOB_QUEUE_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {JOB_QUEUE_MAX} leagues per batch")
+    
+    batch = await run_batch_analysis(league_ids, refresh)
+    if user_id:
+        batch['summary']['user'] = batch['summary']['managers'].get(user_id)
+    batch['results'] = {league_id: format_analysis(result, sections) for league_id, result in batch['results'].items()}
+    return json_response(request, batch)
+
+def parse_scoring_overrides(scoring_settings: str) -> Dict[str, float]:
+    """Validate the what-if `scoring_settings` form field: a JSON object of numeric weights"""
+    try:
+        overrides = json.loads(scoring_settings)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="scoring_settings must be a JSON object")
+    if not isinstance(overrides, dict) or not all(
+            isinstance(value, (int, float)) and not isinstance(value, bool) for value in overrides.values()):
+        raise HTTPException(status_code=400, detail="scoring_settings must map stat names to numbers")
+    return overrides
+
+async def run_what_if_analysis(league_id: str, overrides: Dict[str, float]) -> Dict:
+    """Analyze a league's season as if it had used different scoring settings.
+    
+    Every player-week is re-scored in one batched product, then lineups,
+    results and season metrics are recomputed from the new points. Nothing is
+    memoized, since the results do not describe the real league.
+    """
+    set_log_context(league_id=league_id)
+    league = await analytics.sleeper_api.get_league(league_id)
+    users = await analytics.sleeper_api.get_users(league_id)
+    current_week = league.get('settings', {}).get('leg', 1)
+    season = str(league.get('season', '2023'))
+    scoring_settings = {**(league.get('scoring_settings') or {}), **overrides}
+    if not scoring_settings:
+        raise HTTPException(status_code=400, detail="League has no scoring settings; pass the full scoring_settings")
+    what_if_league = {**league, 'scoring_settings': scoring_settings}
+    context = LeagueContext.from_league(what_if_league, await player_db.get(analytics.sleeper_api))
+    
+    with STAGE_SECONDS.time(stage="what_if_ingest"):
+        all_matchups, all_rosters, all_player_stats = await ingest_weeks(
+            analytics.sleeper_api, league_id, season, current_week,
+            stats_cache=stats_cache, stat_fields=league_stat_fields(what_if_league))
+    with STAGE_SECONDS.time(stage="what_if_rescore"):
+        all_matchups = rescore_matchups(all_matchups, all_player_stats, context.scoring, context.player_position)
+    with STAGE_SECONDS.time(stage="what_if_analyze"):
+        season_data = await analysis_executor.analyze_weeks(
+            context, all_matchups, all_rosters, all_player_stats, 1, [user['user_id'] for user in users])
+    season_summaries = SeasonMatrix(season_data, range(1, current_week + 1)).summaries()
+    
+    return {
+        'league': what_if_league,
+        'users': users,
+        'manager_analytics': {
+            user['user_id']: {'user_info': user, 'season_analysis': season_summaries[user['user_id']]}
+            for user in users
+        },
+        'current_week': current_week,
+        'season': season,
+        'scoring_overrides': overrides
+    }
+
+@app.post("/analyze/what-if")
+async def analyze_what_if(request: Request, league_id: str = Form(...), scoring_settings: str = Form(...),
+                          format: str = Form("full"), fields: str = Form("")):
+    """Re-score a league's season under alternate scoring settings
+    
+    `scoring_settings` is a JSON object merged over the league's own settings,
+    e.g. {"rec": 0.5, "pass_td": 6, "bonus_rec_te": 0.5}. The response has the
+    same shape as /analyze.
+    """
+    sections = response_sections(format, fields)
+    result = await run_what_if_analysis(league_id, parse_scoring_overrides(scoring_settings))
+    return json_response(request, format_analysis(result, sections))
+
+async def backfill_league_history(league_id: str) -> List[Dict]:
+    """Analyze and persist a league and every earlier season on its previous_league_id chain.
+    
+    Seasons already stored as complete are read from the history store without
+    any Sleeper requests; the others are analyzed through the job queue, which
+    persists them. Returns the chain's stored league summaries, newest first.
+    """
+    chain, seen = [], set()
+    next_id = league_id
+    while next_id and next_id != "0" and next_id not in seen:
+        seen.add(next_id)
+        stored = await history_store.league(next_id)
+        if stored is None or not stored['complete']:
+            job = job_queue.submit(next_id)
+            await job.done.wait()
+            if job.status != 'done':
+                raise HTTPException(status_code=job.error_status, detail=job.error)
+            stored = await history_store.league(next_id)
+        chain.append(stored)
+        next_id = stored['previous_league_id']
+    return chain
+
+@app.get("/history/{league_id}")
+async def get_league_history(request: Request, league_id: str, user_id: Optional[str] = None):
+    """Career stats per manager across every season of a league
+    
+    Follows previous_league_id back to the league's first season, backfilling
+    seasons that are not stored yet (once; finished seasons are then served
+    from the local history store). `user_id` limits the managers returned.
+    """
+    set_log_context(league_id=league_id)
+    seasons = await backfill_league_history(league_id)
+    payload = {
+        'league_id': league_id,
+        'seasons': seasons,
+        'managers': await history_store.career_stats([season['league_id'] for season in seasons], user_id)
+    }
+    return cached_json_response(request, content_etag(payload), lambda: payload, cache="http_history")
+
+@app.get("/league/{league_id}")
+async def get_league_data(request: Request, league_id: str):
+    """Get basic league information (reused for LEAGUE_INFO_TTL seconds, with ETag revalidation)"""
+    cached = league_info_cache.get(league_id)
+    if cached is None:
+        try:
+            league = await analytics.sleeper_api.get_league(league_id)
+            users = await analytics.sleeper_api.get_users(league_id)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        payload = {
             'league': league,
             'users': users
         }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        cached = payload, league_info_cache.put(league_id, payload)
+    payload, etag = cached
+    return cached_json_response(request, etag, lambda: payload, cache="http_league")
 
 if __name__ == "__main__":
     import uvicorn
@@ -30,7 +30,7 @@ async function analyzeLeague() {
     hideResults();
     
     try {
-        const response = await fetch('/analyze', {
+        const response = await fetch('/analyze/stream', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/x-www-form-urlencoded',
@@ -42,7 +42,11 @@ async function analyzeLeague() {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
         
-        leagueData = await response.json();
+        leagueData = null;
+        await readEventStream(response, handleAnalysisEvent);
+        if (!leagueData) {
+            throw new Error('No league data received');
+        }
         console.log('Fetch successful! Data received:', leagueData);
         displayResults(leagueData);
         
@@ -54,6 +58,84 @@ async function analyzeLeague() {
     }
 }
 
+// Read a newline-delimited JSON response, calling onEvent for each event
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        
+        buffer += decoder.decode(value, { stream: true });
+        let newline;
+        while ((newline = buffer.indexOf('\n')) >= 0) {
+            const line = buffer.slice(0, newline).trim();
+            buffer = buffer.slice(newline + 1);
+            if (line) onEvent(JSON.parse(line));
+        }
+    }
+    
+    if (buffer.trim()) onEvent(JSON.parse(buffer));
+}
+
+// Render streamed analysis events as they arrive
+function handleAnalysisEvent(event) {
+    switch (event.type) {
+        case 'league':
+            leagueData = {
+                league: event.league,
+                users: event.users,
+                manager_analytics: {},
+                current_week: event.current_week,
+                season: event.season
+            };
+            updateLeagueOverview(leagueData);
+            document.getElementById('managerCards').innerHTML = '';
+            showResults();
+            break;
+        case 'progress':
+            updateProgress(event);
+            break;
+        case 'manager': {
+            leagueData.manager_analytics[event.user_id] = event.analytics;
+            const user = leagueData.users.find(u => u.user_id === event.user_id);
+            if (user) {
+                const card = createManagerCard(user, event.analytics.season_analysis);
+                document.getElementById('managerCards').appendChild(card);
+            }
+            scheduleChartUpdate();
+            break;
+        }
+        case 'error':
+            throw new Error(event.detail || 'Analysis failed');
+    }
+}
+
+// Show ingestion/analysis progress under the spinner
+function updateProgress(event) {
+    const message = document.getElementById('loadingMessage');
+    if (!message) return;
+    
+    if (event.stage === 'ingest') {
+        message.textContent = `Fetching weekly data... ${event.completed}/${event.total}`;
+    } else if (event.stage === 'analyze') {
+        message.textContent = `Analyzing ${event.total} managers...`;
+    }
+}
+
+// Redraw charts at most once per animation frame while managers stream in
+let chartUpdatePending = false;
+function scheduleChartUpdate() {
+    if (chartUpdatePending) return;
+    chartUpdatePending = true;
+    requestAnimationFrame(() => {
+        chartUpdatePending = false;
+        if (leagueData) createCharts(leagueData);
+    });
+}
+
 // Display the analysis results
 function displayResults(data) {
     try {
@@ -1005,6 +1087,7 @@ function showManagerDetails(userId) {
 
 // Utility functions
 function showLoading() {
+    document.getElementById('loadingMessage').textContent = 'Analyzing league data... This may take a few moments.';
     document.getElementById('loading').style.display = 'block';
 }
 
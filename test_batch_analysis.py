@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for multi-league batch analysis against the fake Sleeper API (no network needed)
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from fake_sleeper import generate_league
+
+@pytest.fixture
+def two_leagues(offline):
+    """Two leagues in the same season that share one manager"""
+    first = generate_league(teams=6, weeks=3, player_pool=200, seed=6)
+    shared = first.users[0]['user_id']
+    second = generate_league(teams=6, weeks=3, player_pool=200, seed=7,
+                             user_ids=[shared] + [str(800_000 + i) for i in range(5)])
+    fake = offline.serve([first, second])
+    return fake, first, second, shared
+
+def test_batch_shares_weekly_stats_and_reports_failures(two_leagues):
+    fake, first, second, shared = two_leagues
+    with TestClient(main.app) as client:
+        batch = client.post("/analyze/batch",
+                            data={"league_ids": [first.league_id, second.league_id, "missing"]}).json()
+
+    assert set(batch['results']) == {first.league_id, second.league_id}
+    assert set(batch['errors']) == {"missing"}
+    assert batch['summary']['failed_count'] == 1
+    # Both leagues are in 2023, so each week's stats are downloaded once for the batch
+    for week in (1, 2, 3):
+        assert fake.requests.count(f"/v1/stats/nfl/regular/2023/{week}") == 1
+    assert batch['summary']['managers'][shared]['leagues'] == [first.league_id, second.league_id]
+
+def test_batch_resolves_a_users_leagues(two_leagues):
+    _, first, second, shared = two_leagues
+    with TestClient(main.app) as client:
+        batch = client.post("/analyze/batch", data={"user_id": shared, "season": "2023"}).json()
+        only_first = client.post("/analyze/batch", data={"user_id": first.users[1]['user_id'], "season": "2023"})
+        no_season = client.post("/analyze/batch", data={"user_id": shared})
+
+    assert set(batch['results']) == {first.league_id, second.league_id}
+    assert batch['summary']['user']['wins'] == sum(
+        result['manager_analytics'][shared]['season_analysis']['wins'] for result in batch['results'].values())
+    assert set(only_first.json()['results']) == {first.league_id}
+    assert no_season.status_code == 400
+
+def test_batch_that_does_not_fit_queues_nothing(two_leagues, offline):
+    _, first, second, _ = two_leagues
+    offline.restart(max_queued=1)
+    with TestClient(main.app) as client:
+        response = client.post("/analyze/batch", data={"league_ids": [first.league_id, second.league_id]})
+
+    assert response.status_code == 503
+    assert main.job_queue.jobs == {}
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Tests for the benchmark regression check
+"""
+
+from benchmark import compare
+
+def test_compare_flags_cases_over_threshold():
+    baseline = {'cases': {'weekly[teams=10,weeks=14]': {'mean_ms': 10.0, 'peak_kb': 100.0},
+                          'season[teams=10,weeks=14]': {'mean_ms': 2.0, 'peak_kb': 50.0}}}
+    results = {'cases': {'weekly[teams=10,weeks=14]': {'mean_ms': 12.0, 'peak_kb': 100.0},
+                         'season[teams=10,weeks=14]': {'mean_ms': 2.0, 'peak_kb': 80.0},
+                         'analyze[teams=10,weeks=14]': {'mean_ms': 500.0, 'peak_kb': 1.0}}}
+
+    assert compare(results, baseline, threshold=0.25) == ["season[teams=10,weeks=14] peak_kb: 50.0 -> 80.0 (+60%)"]
+    assert len(compare(results, baseline, threshold=0.1)) == 2
+
+if __name__ == "__main__":
+    test_compare_flags_cases_over_threshold()
+    print("✅ Benchmark comparison test passed")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent league history store against the fake Sleeper API (no network needed)
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from fake_sleeper import generate_league
+
+@pytest.fixture
+def dynasty(offline):
+    """A league in its second season whose first (finished) season is linked by previous_league_id"""
+    first = generate_league(teams=8, weeks=5, season="2022", seed=2)
+    first.league['status'] = 'complete'
+    user_ids = [user['user_id'] for user in first.users]
+    second = generate_league(teams=8, weeks=4, season="2023", seed=3, previous_league_id=first.league_id,
+                             user_ids=user_ids)
+    fake = offline.serve([first, second])
+    return fake, first, second
+
+def test_history_backfills_previous_seasons_once(dynasty):
+    fake, first, second = dynasty
+    with TestClient(main.app) as client:
+        history = client.get(f"/history/{second.league_id}").json()
+        requests_before = fake.requests.count(f"/v1/league/{first.league_id}")
+        again = client.get(f"/history/{second.league_id}")
+        seasons = {league_id: client.post("/analyze", data={"league_id": league_id}).json()
+                   for league_id in (first.league_id, second.league_id)}
+
+    assert [season['season'] for season in history['seasons']] == ["2023", "2022"]
+    assert history['seasons'][1]['complete'] and not history['seasons'][0]['complete']
+    # The finished season is served from the store
+    assert fake.requests.count(f"/v1/league/{first.league_id}") == requests_before
+    assert again.json()['managers'] == history['managers']
+
+    # Every week of the finished season is stored, but only the completed weeks of the current one
+    for user_id, career in history['managers'].items():
+        first_season = seasons[first.league_id]['manager_analytics'][user_id]['season_analysis']
+        second_season = seasons[second.league_id]['manager_analytics'][user_id]['season_analysis']
+        assert career['seasons'] == 2
+        assert career['total_weeks'] == 5 + 3
+        assert career['wins'] == first_season['wins'] + sum(
+            week['result'] == 'W' for week in second_season['weekly_data'][:3])
+        assert career['by_season']["2022"]['total_actual_points'] == pytest.approx(first_season['total_actual_points'])
+
+def test_stored_weeks_survive_a_restart(dynasty, offline):
+    fake, _, second = dynasty
+    with TestClient(main.app) as client:
+        before = client.post("/analyze", data={"league_id": second.league_id}).json()
+
+    # A new process: fresh client and empty in-memory caches, same database
+    offline.restart()
+    with TestClient(main.app) as client:
+        after = client.post("/analyze", data={"league_id": second.league_id}).json()
+
+    # Only the in-progress week is fetched again
+    assert fake.requests.count(f"/v1/league/{second.league_id}/matchups/1") == 1
+    assert fake.requests.count(f"/v1/league/{second.league_id}/matchups/4") == 2
+    assert after['manager_analytics'] == before['manager_analytics']
+
+def test_finished_league_is_served_from_memoized_weeks(dynasty, offline):
+    fake, first, _ = dynasty
+    # Results expire at once, so every request runs a new analysis
+    offline.restart(result_ttl=0)
+    with TestClient(main.app) as client:
+        before = client.post("/analyze", data={"league_id": first.league_id})
+        again = client.post("/analyze", data={"league_id": first.league_id})
+        stream = client.post("/analyze/stream", data={"league_id": first.league_id})
+
+    assert before.status_code == 200 and again.status_code == 200
+    assert again.json()['manager_analytics'] == before.json()['manager_analytics']
+    assert json.loads(stream.text.splitlines()[-1]) == {'type': 'done'}
+    # Every week of a finished season is fetched once
+    assert fake.requests.count(f"/v1/league/{first.league_id}/matchups/5") == 1
+
+    # Same after a restart, with the weeks read back from the store
+    offline.restart(result_ttl=0)
+    with TestClient(main.app) as client:
+        restarted = client.post("/analyze", data={"league_id": first.league_id})
+    assert restarted.status_code == 200
+    assert restarted.json()['manager_analytics'] == before.json()['manager_analytics']
+    assert fake.requests.count(f"/v1/league/{first.league_id}/matchups/5") == 1
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
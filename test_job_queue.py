@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the analysis job queue against the fake Sleeper API (no network needed)
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+import main
+from fake_sleeper import generate_league
+
+@pytest.fixture
+def fake(offline):
+    return offline.serve([generate_league(teams=8, weeks=4, player_pool=300, seed=4)])
+
+def run_with_queue(monkeypatch, scenario, **queue_options):
+    """Run `scenario(queue)` on a fresh event loop with a fresh job queue installed"""
+    async def run():
+        queue = main.AnalysisJobQueue(main.job_queue.runner, **queue_options)
+        monkeypatch.setattr(main, "job_queue", queue)
+        try:
+            return await scenario(queue)
+        finally:
+            await queue.stop()
+    return asyncio.run(run())
+
+def test_concurrent_submits_share_one_analysis(fake, monkeypatch):
+    league_id = next(iter(fake.leagues))
+
+    async def scenario(queue):
+        jobs = [queue.submit(league_id) for _ in range(10)]
+        await asyncio.gather(*(job.done.wait() for job in jobs))
+        return jobs
+
+    jobs = run_with_queue(monkeypatch, scenario)
+    assert len({job.id for job in jobs}) == 1 and jobs[0].status == 'done'
+    assert fake.requests.count(f"/v1/league/{league_id}") == 1
+
+def test_concurrent_streams_share_one_analysis(fake, monkeypatch):
+    league_id = next(iter(fake.leagues))
+
+    async def scenario(queue):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://app") as client:
+            responses = await asyncio.gather(*(client.post("/analyze/stream", data={"league_id": league_id})
+                                               for _ in range(5)))
+            # A stream after the job finished replays its events
+            late = await client.post("/analyze/stream", data={"league_id": league_id})
+        return [*responses, late]
+
+    streams = [[json.loads(line) for line in response.text.splitlines()]
+               for response in run_with_queue(monkeypatch, scenario)]
+    assert fake.requests.count(f"/v1/league/{league_id}") == 1
+    for events in streams:
+        assert events[0]['type'] == 'league' and events[-1] == {'type': 'done'}
+        assert sum(event['type'] == 'manager' for event in events) == 8
+        assert events == streams[0]
+
+def test_full_queue_rejects_new_leagues(fake, monkeypatch):
+    async def scenario(queue):
+        queue.start()
+        blocked = asyncio.Event()
+        queue.runner = lambda league_id, refresh, emit: blocked.wait()
+        queue.submit("a")
+        await asyncio.sleep(0)  # the only worker takes "a"
+        queue.submit("b")
+        with pytest.raises(HTTPException) as error:
+            queue.submit("c")
+        # The league already waiting is still joined
+        assert queue.submit("b").league_id == "b"
+        blocked.set()
+        return error.value
+
+    error = run_with_queue(monkeypatch, scenario, workers=1, max_queued=1)
+    assert error.status_code == 503
+
+def test_finished_results_expire(fake, monkeypatch):
+    league_id = next(iter(fake.leagues))
+
+    async def scenario(queue):
+        first = queue.submit(league_id)
+        await first.done.wait()
+        reused = queue.submit(league_id)
+        queue.result_ttl = 0
+        await asyncio.sleep(0.01)
+        expired = queue.submit(league_id)
+        await expired.done.wait()
+        return first, reused, expired
+
+    first, reused, expired = run_with_queue(monkeypatch, scenario)
+    assert reused is first
+    assert expired is not first and main.job_queue.get(first.id) is None
+    assert fake.requests.count(f"/v1/league/{league_id}") == 2
+
+def test_client_errors_are_logged_without_a_traceback(fake, monkeypatch, caplog):
+    league_id = next(iter(fake.leagues))
+
+    async def scenario(queue):
+        jobs = [queue.submit("no-such-league"), queue.submit(league_id)]
+        await asyncio.gather(*(job.done.wait() for job in jobs))
+        return jobs
+
+    # The app logger does not propagate to the root logger caplog listens on
+    main.logger.addHandler(caplog.handler)
+    try:
+        missing, found = run_with_queue(monkeypatch, scenario)
+    finally:
+        main.logger.removeHandler(caplog.handler)
+
+    assert missing.status == 'failed' and missing.error_status == 404
+    assert found.status == 'done'
+    failures = [record for record in caplog.records if "failed" in record.getMessage()]
+    assert len(failures) == 1
+    assert failures[0].levelname == 'WARNING' and failures[0].exc_info is None
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
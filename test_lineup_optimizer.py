@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for the optimal lineup solver (no running server needed)
+"""
+
+from main import FantasyAnalytics, LeagueContext, LineupOptimizer, PlayerInfo
+
+def player(player_id, position, points):
+    return {'player_id': player_id, 'name': player_id, 'position': position, 'points': points}
+
+def test_flex_takes_best_remaining_player():
+    optimizer = LineupOptimizer(['QB', 'RB', 'WR', 'FLEX', 'BN', 'BN'])
+    lineup = optimizer.solve([
+        player('qb', 'QB', 20),
+        player('rb1', 'RB', 15),
+        player('rb2', 'RB', 12),
+        player('wr1', 'WR', 10),
+        player('wr2', 'WR', 8),
+    ])
+    slots = {p['slot']: p['player_id'] for p in lineup}
+    assert slots == {'QB': 'qb', 'RB': 'rb1', 'WR': 'wr1', 'FLEX': 'rb2'}
+
+def test_super_flex_prefers_second_qb():
+    optimizer = LineupOptimizer(['QB', 'RB', 'SUPER_FLEX'])
+    lineup = optimizer.solve([
+        player('qb1', 'QB', 25),
+        player('qb2', 'QB', 18),
+        player('rb1', 'RB', 14),
+        player('rb2', 'RB', 11),
+    ])
+    assert sum(p['points'] for p in lineup) == 57
+    assert {p['player_id'] for p in lineup} == {'qb1', 'qb2', 'rb1'}
+
+def test_overlapping_flex_slots_are_solved_exactly():
+    # A greedy fill would put the WR into WRRB_FLEX and leave REC_FLEX without the TE
+    optimizer = LineupOptimizer(['WRRB_FLEX', 'REC_FLEX'])
+    lineup = optimizer.solve([
+        player('wr', 'WR', 20),
+        player('rb', 'RB', 15),
+        player('te', 'TE', 5),
+    ])
+    assert sum(p['points'] for p in lineup) == 35
+    assert {p['slot']: p['player_id'] for p in lineup} == {'WRRB_FLEX': 'rb', 'REC_FLEX': 'wr'}
+
+def test_idp_positions_fill_idp_slots():
+    optimizer = LineupOptimizer(['DL', 'DB', 'IDP_FLEX'])
+    lineup = optimizer.solve([
+        player('de', 'DE', 6),
+        player('cb', 'CB', 4),
+        player('lb', 'LB', 9),
+    ])
+    assert {p['slot']: p['player_id'] for p in lineup} == {'DL': 'de', 'DB': 'cb', 'IDP_FLEX': 'lb'}
+
+def test_weekly_analysis_suggests_bench_swap():
+    context = LeagueContext.from_league({'roster_positions': ['QB', 'RB', 'BN']}, {
+        'qb': PlayerInfo('Quarter Back', 'QB', 'BUF'),
+        'rb1': PlayerInfo('Running Back', 'RB', 'BUF'),
+        'rb2': PlayerInfo('Bench Back', 'RB', 'KC'),
+    })
+    roster = {'starters': ['qb', 'rb1'], 'players': ['qb', 'rb1', 'rb2']}
+    matchup = {'starters_points': [20.0, 3.0]}
+    analysis = FantasyAnalytics().analyze_weekly_performance(context, roster, matchup, {'rb2': {'pts_ppr': 11.0}})
+    assert analysis['actual_points'] == 23.0
+    assert analysis['optimal_points'] == 31.0
+    assert len(analysis['improvements']) == 1
+    improvement = analysis['improvements'][0]
+    assert improvement['replaced']['player_id'] == 'rb1'
+    assert improvement['with']['player_id'] == 'rb2'
+    assert improvement['point_gain'] == 8.0
+
+def test_improvements_swap_within_each_slot():
+    context = LeagueContext.from_league({'roster_positions': ['QB', 'RB', 'FLEX', 'BN', 'BN', 'BN']}, {
+        'qb1': PlayerInfo('QB One', 'QB', 'BUF'),
+        'qb2': PlayerInfo('QB Two', 'QB', 'KC'),
+        'rb1': PlayerInfo('RB One', 'RB', 'BUF'),
+        'rb2': PlayerInfo('RB Two', 'RB', 'KC'),
+        'rb3': PlayerInfo('RB Three', 'RB', 'KC'),
+        'wr1': PlayerInfo('WR One', 'WR', 'KC'),
+    })
+    roster = {'starters': ['qb1', 'rb1', 'rb3'], 'players': ['qb1', 'qb2', 'rb1', 'rb2', 'rb3', 'wr1']}
+    matchup = {'starters_points': [10.0, 3.0, 9.0], 'players_points': {'qb2': 30.0, 'rb2': 12.0, 'wr1': 2.0}}
+    analysis = FantasyAnalytics().analyze_weekly_performance(context, roster, matchup, {})
+
+    swaps = {i['replaced']['player_id']: i['with']['player_id'] for i in analysis['improvements']}
+    # rb3 keeps its FLEX slot rather than being shuffled into RB
+    assert swaps == {'qb1': 'qb2', 'rb1': 'rb2'}
+    assert analysis['optimal_points'] - analysis['actual_points'] == sum(
+        i['point_gain'] for i in analysis['improvements'])
+
+def test_negative_starter_is_benched_for_an_empty_slot():
+    context = LeagueContext.from_league({'roster_positions': ['QB', 'K', 'BN']}, {
+        'qb': PlayerInfo('Quarter Back', 'QB', 'BUF'),
+        'k': PlayerInfo('Kicker', 'K', 'BUF'),
+        'qb2': PlayerInfo('Backup', 'QB', 'KC'),
+    })
+    roster = {'starters': ['qb', 'k'], 'players': ['qb', 'k', 'qb2']}
+    matchup = {'starters_points': [20.0, -2.0], 'players_points': {'qb2': 5.0}}
+    analysis = FantasyAnalytics().analyze_weekly_performance(context, roster, matchup, {})
+
+    assert analysis['optimal_points'] == 20.0
+    [improvement] = analysis['improvements']
+    assert improvement['replaced']['player_id'] == 'k'
+    assert improvement['with'] == {'player_id': '0', 'name': 'Empty slot', 'points': 0, 'position': 'K'}
+    assert improvement['point_gain'] == 2.0
+
+if __name__ == "__main__":
+    test_flex_takes_best_remaining_player()
+    test_super_flex_prefers_second_qb()
+    test_overlapping_flex_slots_are_solved_exactly()
+    test_idp_positions_fill_idp_slots()
+    test_weekly_analysis_suggests_bench_swap()
+    test_improvements_swap_within_each_slot()
+    test_negative_starter_is_benched_for_an_empty_slot()
+    print("✅ All lineup optimizer tests passed")
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+End-to-end tests of the analysis pipeline against the fake Sleeper API (no network needed)
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from fake_sleeper import FakeSleeper, generate_league
+
+@pytest.fixture
+def fake(offline):
+    """Route the app's Sleeper calls to a fake with a fresh set of caches"""
+    return offline.serve([generate_league(teams=10, weeks=6, player_pool=400, seed=1)])
+
+def test_generated_league_is_consistent():
+    league = generate_league(teams=8, weeks=3, roster_positions=['QB', 'RB', 'WR', 'SUPER_FLEX', 'DL', 'LB', 'BN', 'BN'],
+                             seed=5)
+    assert len(league.rosters) == 8
+    for week, matchups in league.matchups.items():
+        assert sorted(m['matchup_id'] for m in matchups) == sorted(list(range(1, 5)) * 2)
+        for matchup in matchups:
+            assert len(matchup['starters']) == 6
+            assert set(matchup['starters']) <= set(matchup['players'])
+            assert matchup['points'] == pytest.approx(sum(matchup['starters_points']))
+    # Same seed, same league
+    assert generate_league(teams=8, weeks=3, seed=5).matchups == generate_league(teams=8, weeks=3, seed=5).matchups
+
+def test_analyze_league_offline(fake):
+    league = next(iter(fake.leagues.values()))
+    with TestClient(main.app) as client:
+        response = client.post("/analyze", data={"league_id": league.league_id})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data['current_week'] == 6
+    assert len(data['manager_analytics']) == 10
+
+    for manager in data['manager_analytics'].values():
+        season = manager['season_analysis']
+        assert len(season['weekly_data']) == 6
+        assert season['wins'] + season['losses'] + season.get('ties', 0) == 6
+        for week in season['weekly_data']:
+            assert week['optimal_points'] >= week['actual_points'] - 0.01
+
+    odds = data['playoff_odds']
+    assert set(odds['teams']) == set(data['manager_analytics'])
+    assert sum(team['playoff_probability'] for team in odds['teams'].values()) == pytest.approx(6, abs=1e-3)
+
+def test_weekly_rosters_come_from_matchups(fake):
+    league = next(iter(fake.leagues.values()))
+    with TestClient(main.app) as client:
+        data = client.post("/analyze", data={"league_id": league.league_id}).json()
+
+    # Rosters are fetched once, not once per week
+    assert fake.requests.count(f"/v1/league/{league.league_id}/rosters") == 1
+    roster_ids = {roster['owner_id']: roster['roster_id'] for roster in league.rosters}
+    for user_id, manager in data['manager_analytics'].items():
+        for week in manager['season_analysis']['weekly_data']:
+            matchup = next(m for m in league.matchups[week['week']] if m['roster_id'] == roster_ids[user_id])
+            # Bench suggestions only use players who were on the roster that week
+            assert all(i['with']['player_id'] in matchup['players'] for i in week['improvements'])
+
+def test_playoff_odds_with_memoized_weeks(fake, offline):
+    league = next(iter(fake.leagues.values()))
+    offline.restart(result_ttl=0)
+    with TestClient(main.app) as client:
+        first = client.post("/analyze", data={"league_id": league.league_id}).json()
+        # Weeks 1-5 are memoized, only the current week is ingested again
+        second = client.post("/analyze", data={"league_id": league.league_id}).json()
+
+    assert fake.requests.count(f"/v1/league/{league.league_id}/matchups/1") == 1
+    assert fake.requests.count(f"/v1/league/{league.league_id}/rosters") == 2
+    assert set(second['playoff_odds']['teams']) == set(second['manager_analytics'])
+    assert second['playoff_odds'] == first['playoff_odds']
+
+def test_process_executor_matches_inline(fake, offline, monkeypatch):
+    league = next(iter(fake.leagues.values()))
+    results = {}
+    for mode, workers in (("inline", 1), ("process", 1)):
+        # Nothing memoized, so both the weekly analysis and the playoff simulation run in the executor
+        offline.restart()
+        executor = main.AnalysisExecutor(mode, workers)
+        monkeypatch.setattr(main, "analysis_executor", executor)
+        try:
+            results[mode] = asyncio.run(main.run_league_analysis(league.league_id))
+        finally:
+            executor.shutdown()
+
+    assert results["process"]['playoff_odds'] is not None
+    assert results["process"] == results["inline"]
+
+def test_metrics_after_an_analysis(fake):
+    league = next(iter(fake.leagues.values()))
+    with TestClient(main.app) as client:
+        assert client.post("/analyze", data={"league_id": league.league_id}).status_code == 200
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain')
+    samples = {line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+               for line in response.text.splitlines() if line and not line.startswith('#')}
+    assert samples['sleeper_request_duration_seconds_bucket{endpoint="stats",le="+Inf"}'] >= 6
+    assert samples['cache_requests_total{cache="stats",result="miss"}'] >= 6
+    assert samples['cache_requests_total{cache="league_weeks",result="miss"}'] >= 6
+    assert samples['analysis_stage_duration_seconds_count{stage="total"}'] >= 1
+
+def test_no_playoff_odds_after_the_regular_season(fake):
+    league = next(iter(fake.leagues.values()))
+    league.league['status'] = 'complete'
+    with TestClient(main.app) as client:
+        data = client.post("/analyze", data={"league_id": league.league_id}).json()
+    assert data['playoff_odds'] is None
+    assert data['manager_analytics']
+
+def test_empty_week_is_not_memoized(fake, offline):
+    league = next(iter(fake.leagues.values()))
+    offline.restart(result_ttl=0)
+    week_3 = league.matchups.pop(3)
+    with TestClient(main.app) as client:
+        partial = client.post("/analyze", data={"league_id": league.league_id}).json()
+        # Sleeper serves the week again
+        league.matchups[3] = week_3
+        fake._encoded.clear()
+        full = client.post("/analyze", data={"league_id": league.league_id}).json()
+
+    assert all(m['season_analysis']['total_weeks'] == 5 for m in partial['manager_analytics'].values())
+    assert all(m['season_analysis']['total_weeks'] == 6 for m in full['manager_analytics'].values())
+    assert fake.requests.count(f"/v1/league/{league.league_id}/matchups/3") == 2
+    assert fake.requests.count(f"/v1/league/{league.league_id}/matchups/2") == 1
+
+def test_compact_response_offline(fake):
+    league = next(iter(fake.leagues.values()))
+    with TestClient(main.app) as client:
+        full = client.post("/analyze", data={"league_id": league.league_id})
+        compact = client.post("/analyze", data={"league_id": league.league_id, "format": "compact"},
+                              headers={"Accept-Encoding": "gzip"})
+        summary = client.post("/analyze", data={"league_id": league.league_id, "fields": "summary"})
+        bad = client.post("/analyze", data={"league_id": league.league_id, "fields": "lineups"})
+
+    assert compact.headers['content-encoding'] == 'gzip'
+    assert len(compact.content) < len(full.content) / 2
+    data = compact.json()
+    manager = data['managers'][0]
+    full_season = full.json()['manager_analytics'][manager['user_id']]['season_analysis']
+    assert manager['summary']['wins'] == full_season['wins']
+    assert data['weekly'][manager['user_id']]['optimal_points'] == [w['optimal_points'] for w in full_season['weekly_data']]
+    improvements = data['improvements'][manager['user_id']]
+    assert all(player_id in data['players'] for player_id in improvements['with'] + improvements['replaced'])
+
+    assert set(summary.json()) == {'current_week', 'season', 'league', 'managers'}
+    assert bad.status_code == 400
+
+def test_conditional_requests_offline(fake):
+    league = next(iter(fake.leagues.values()))
+    with TestClient(main.app) as client:
+        first = client.get(f"/analyze/{league.league_id}")
+        etag = first.headers['etag']
+        revalidated = client.get(f"/analyze/{league.league_id}", headers={"If-None-Match": etag})
+        any_version = client.get(f"/analyze/{league.league_id}", headers={"If-None-Match": "*"})
+        compact = client.get(f"/analyze/{league.league_id}", params={"format": "compact"},
+                             headers={"If-None-Match": etag})
+        # POST is never answered with a 304
+        posted = client.post("/analyze", data={"league_id": league.league_id}, headers={"If-None-Match": "*"})
+
+        info = client.get(f"/league/{league.league_id}")
+        requests_before = len(fake.requests)
+        info_revalidated = client.get(f"/league/{league.league_id}", headers={"If-None-Match": info.headers['etag']})
+
+    assert 'max-age' in first.headers['cache-control']
+    assert revalidated.status_code == 304 and revalidated.content == b''
+    assert any_version.status_code == 304
+    assert posted.status_code == 200 and posted.headers['etag'] == etag and 'cache-control' not in posted.headers
+    assert compact.status_code == 200 and compact.headers['etag'] != etag
+    assert info_revalidated.status_code == 304
+    assert len(fake.requests) == requests_before
+
+def test_league_info_keeps_upstream_status(fake, monkeypatch):
+    with TestClient(main.app) as client:
+        missing = client.get("/league/missing")
+    assert missing.status_code == 404 and missing.json()['detail']
+
+    # Sleeper being down is a 503, not a 500
+    down = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(503)))
+    monkeypatch.setattr(main.analytics, "sleeper_api", main.SleeperAPI(base_url=FakeSleeper.BASE_URL, client=down,
+                                                                       max_retries=0))
+    with TestClient(main.app) as client:
+        unavailable = client.get("/league/other")
+    assert unavailable.status_code == 503
+
+def test_what_if_rescoring_offline(fake):
+    league = next(iter(fake.leagues.values()))
+    with TestClient(main.app) as client:
+        actual = client.post("/analyze", data={"league_id": league.league_id}).json()
+        same = client.post("/analyze/what-if", data={"league_id": league.league_id, "scoring_settings": "{}"}).json()
+        standard = client.post("/analyze/what-if", data={"league_id": league.league_id,
+                                                         "scoring_settings": json.dumps({"rec": 0})}).json()
+        bad = client.post("/analyze/what-if", data={"league_id": league.league_id, "scoring_settings": "[1]"})
+
+    def totals(result, field):
+        return {uid: m['season_analysis'][field] for uid, m in result['manager_analytics'].items()}
+
+    assert totals(same, 'total_actual_points') == pytest.approx(totals(actual, 'total_actual_points'))
+    assert totals(same, 'total_optimal_points') == pytest.approx(totals(actual, 'total_optimal_points'))
+    assert all(standard_points < ppr_points for standard_points, ppr_points in
+               zip(totals(standard, 'total_actual_points').values(), totals(actual, 'total_actual_points').values()))
+    assert standard['league']['scoring_settings']['rec'] == 0
+    assert bad.status_code == 400
+
+def test_what_if_without_any_scoring_settings(fake):
+    league = next(iter(fake.leagues.values()))
+    league.league['scoring_settings'] = {}
+    with TestClient(main.app) as client:
+        empty = client.post("/analyze/what-if", data={"league_id": league.league_id, "scoring_settings": "{}"})
+        ppr = client.post("/analyze/what-if", data={"league_id": league.league_id,
+                                                    "scoring_settings": json.dumps({"rec": 1, "rec_yd": 0.1})})
+    assert empty.status_code == 400
+    assert ppr.status_code == 200
+
+def test_stream_unknown_league_offline(fake):
+    with TestClient(main.app) as client:
+        response = client.post("/analyze/stream", data={"league_id": "missing"})
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert events[-1]['type'] == 'error'
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
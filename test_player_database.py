@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for the on-disk NFL player index (no network needed)
+"""
+
+import asyncio
+import os
+
+import pytest
+
+import main
+from fake_sleeper import FakeSleeper, generate_league
+
+class PlayersPayloads:
+    """Sleeper stand-in that serves the given /players/nfl payloads in order"""
+
+    def __init__(self, *payloads):
+        self.payloads = list(payloads)
+        self.calls = 0
+
+    async def get_players(self):
+        self.calls += 1
+        return self.payloads.pop(0)
+
+def fake_api():
+    fake = FakeSleeper([generate_league(teams=4, weeks=1, seed=8)])
+    return fake, main.SleeperAPI(base_url=FakeSleeper.BASE_URL, client=fake.client())
+
+def test_downloads_once_and_loads_from_disk(tmp_path):
+    fake, api = fake_api()
+    db = main.PlayerDatabase(cache_dir=str(tmp_path))
+    players = asyncio.run(db.get(api))
+    asyncio.run(db.get(api))
+
+    assert fake.requests.count("/v1/players/nfl") == 1
+    assert os.path.exists(db.path)
+    some_id, info = next(iter(players.items()))
+    assert info.position == fake.leagues[next(iter(fake.leagues))].players[some_id]['position']
+
+    # After a restart the index is read from disk instead of downloaded
+    restarted = main.PlayerDatabase(cache_dir=str(tmp_path))
+    assert restarted.load()
+    assert asyncio.run(restarted.get(api)) == players
+    assert fake.requests.count("/v1/players/nfl") == 1
+
+def test_refreshes_after_ttl_and_keeps_index_on_failure(tmp_path):
+    api = PlayersPayloads({'1': {'first_name': 'A', 'last_name': 'B', 'position': 'QB', 'team': 'KC'}},
+                          {'1': {'first_name': 'A', 'last_name': 'B', 'position': 'QB', 'team': 'BUF'}},
+                          {})
+    db = main.PlayerDatabase(cache_dir=str(tmp_path), ttl=3600)
+    assert asyncio.run(db.get(api))['1'].team == 'KC'
+    assert asyncio.run(db.get(api))['1'].team == 'KC' and api.calls == 1
+
+    db.fetched_at -= 7200  # past the TTL
+    assert asyncio.run(db.get(api))['1'].team == 'BUF' and api.calls == 2
+
+    # An empty download does not replace the index
+    db.fetched_at -= 7200
+    assert asyncio.run(db.get(api))['1'].team == 'BUF' and api.calls == 3
+    reloaded = main.PlayerDatabase(cache_dir=str(tmp_path))
+    assert reloaded.load() and reloaded.players['1'].team == 'BUF'
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Tests for the Monte Carlo playoff-odds simulator (no network needed)
+"""
+
+import numpy as np
+import pytest
+
+from main import PlayoffSimulator
+
+def make_simulator(schedule, playoff_teams=4):
+    """Eight teams with 4 weeks played: team i has won i games and scores about 100 + 5i"""
+    teams = 8
+    history = np.array([[100 + 5 * i + week for week in range(4)] for i in range(teams)], dtype=float)
+    wins = np.minimum(np.arange(teams), 4)
+    byes = (1 << (playoff_teams - 1).bit_length()) - playoff_teams
+    return PlayoffSimulator([str(i) for i in range(teams)], wins, history.sum(axis=1), history, schedule,
+                            playoff_teams, byes)
+
+def test_seeded_simulation_is_reproducible():
+    week = [(0, 7), (1, 6), (2, 5), (3, 4)]
+    simulator = make_simulator([week, [(0, 1), (2, 3), (4, 5), (6, 7)]], playoff_teams=6)
+
+    first = simulator.simulate(20000, seed=7)
+    assert first == simulator.simulate(20000, seed=7)
+    assert first['byes'] == 2 and first['remaining_weeks'] == 2
+
+    teams = first['teams'].values()
+    assert sum(team['playoff_probability'] for team in teams) == pytest.approx(6, abs=1e-3)
+    assert sum(team['bye_probability'] for team in teams) == pytest.approx(2, abs=1e-3)
+    for seed in range(6):
+        assert sum(team['seed_probabilities'][seed] for team in teams) == pytest.approx(1, abs=1e-3)
+    # Better records and scoring make the playoffs more often
+    assert first['teams']['7']['playoff_probability'] > first['teams']['0']['playoff_probability']
+    assert first['teams']['7']['projected_wins'] > 4
+
+def test_final_standings_without_remaining_schedule():
+    result = make_simulator([]).simulate(1000, seed=1)
+
+    assert result['simulations'] == 1
+    playoff = {user_id for user_id, team in result['teams'].items() if team['playoff_probability'] == 1}
+    # Teams 4-7 are tied on wins; points for breaks the tie
+    assert playoff == {'4', '5', '6', '7'}
+    assert result['teams']['7']['seed_probabilities'] == [1.0, 0.0, 0.0, 0.0]
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Tests for league scoring and what-if re-scoring (no network needed)
+"""
+
+import pytest
+
+from fake_sleeper import generate_league, score
+from main import ScoringEngine, WeekStats
+
+def test_matches_per_player_scoring():
+    league = generate_league(teams=4, weeks=2, seed=3)
+    settings = {**league.league['scoring_settings'], 'rec': 0.5, 'pass_td': 6}
+    engine = ScoringEngine(settings)
+    weeks = [WeekStats.from_payload(league.stats[week]) for week in (1, 2)]
+    
+    points = engine.score_weeks(weeks, lambda pid: league.players[pid]['position'])
+    for week, week_points in zip((1, 2), points):
+        for player_id, line in league.stats[week].items():
+            assert week_points[player_id] == pytest.approx(score(line, settings))
+
+def test_position_bonus_only_applies_to_that_position():
+    stats = WeekStats.from_payload({'te': {'rec': 5, 'rec_yd': 50}, 'wr': {'rec': 5, 'rec_yd': 50}})
+    engine = ScoringEngine({'rec': 1, 'rec_yd': 0.1, 'bonus_rec_te': 0.5, 'pass_2pt': 0})
+    
+    points = engine.score_weeks([stats], {'te': 'TE', 'wr': 'WR'}.get)[0]
+    assert points == {'te': 12.5, 'wr': 10.0}
+    assert engine.fields == ('rec', 'rec_yd')
+
+if __name__ == "__main__":
+    test_matches_per_player_scoring()
+    test_position_bonus_only_applies_to_that_position()
+    print("✅ All scoring engine tests passed")
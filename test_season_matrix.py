@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for the vectorized season metrics (no running server needed)
+"""
+
+from main import SeasonMatrix
+
+def week(number, points, points_against):
+    return {
+        'week': number,
+        'actual_points': points,
+        'optimal_points': points + 10,
+        'points_for': points,
+        'points_against': points_against,
+        'improvements': [],
+        'result': 'W' if points > points_against else 'L'
+    }
+
+def test_season_totals_and_league_metrics():
+    season_data = {
+        'a': [week(1, 120, 100), week(2, 90, 80)],
+        'b': [week(1, 100, 120), week(2, 110, 70)],
+        'c': [week(1, 80, 60), week(2, 80, 90)],
+        'd': [week(1, 60, 80), week(2, 70, 110)],
+    }
+    summaries = SeasonMatrix(season_data, [1, 2]).summaries()
+    
+    a = summaries['a']
+    assert (a['wins'], a['losses']) == (2, 0)
+    assert a['total_actual_points'] == 210
+    assert a['points_lost_to_suboptimal_lineups'] == 20
+    assert a['average_actual_points'] == 105
+    # Week 1: beats b, c, d; week 2: beats c, d
+    assert (a['all_play_wins'], a['all_play_losses']) == (5, 1)
+    assert a['median_wins'] == 2
+    assert abs(a['expected_wins'] - 5 / 3) < 1e-9
+    assert abs(a['luck'] - (2 - 5 / 3)) < 1e-9
+    assert a['points_std_dev'] == 15
+    
+    d = summaries['d']
+    assert (d['all_play_wins'], d['all_play_losses']) == (0, 6)
+    assert d['median_wins'] == 0
+
+def test_missing_weeks_are_ignored():
+    season_data = {
+        'a': [week(1, 100, 90)],
+        'b': [week(1, 90, 100), week(2, 95, 0)],
+        'c': [],
+    }
+    summaries = SeasonMatrix(season_data, [1, 2]).summaries()
+    assert summaries['a']['total_weeks'] == 1
+    assert summaries['b']['total_weeks'] == 2
+    assert summaries['c']['total_weeks'] == 0
+    assert summaries['c']['win_percentage'] == 0
+    assert summaries['c']['weekly_data'] == []
+
+if __name__ == "__main__":
+    test_season_totals_and_league_metrics()
+    test_missing_weeks_are_ignored()
+    print("✅ All season matrix tests passed")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests for Sleeper API retries, the circuit breaker and concurrent ingestion (no network needed)
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from main import (CircuitBreaker, PlayerDatabase, PlayerInfo, SleeperAPI, SleeperUnavailable, TokenBucket,
+                  ingest_weeks)
+
+def make_api(handler, breaker=None):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return SleeperAPI(base_url="http://sleeper.test/v1", client=client,
+                      rate_limiter=TokenBucket(rate_per_minute=60000, burst=100),
+                      breaker=breaker or CircuitBreaker(threshold=2, cooldown=60),
+                      max_retries=2, backoff_base=0.001, backoff_max=0.01)
+
+def test_retries_throttled_requests():
+    responses = [httpx.Response(429), httpx.Response(503), httpx.Response(200, json=[{'roster_id': 1}])]
+    
+    def handler(request):
+        return responses.pop(0)
+    
+    matchups = asyncio.run(make_api(handler).get_matchups("L", 1))
+    assert matchups == [{'roster_id': 1}]
+    assert responses == []
+
+def test_exhausted_retries_raise_instead_of_returning_empty():
+    def handler(request):
+        return httpx.Response(429)
+    
+    with pytest.raises(SleeperUnavailable):
+        asyncio.run(make_api(handler).get_player_stats(1, "2023"))
+
+def test_circuit_opens_after_repeated_failures():
+    calls = []
+    
+    def handler(request):
+        calls.append(request.url.path)
+        raise httpx.ConnectTimeout("timed out")
+    
+    api = make_api(handler)
+    
+    async def run():
+        for _ in range(2):
+            with pytest.raises(SleeperUnavailable):
+                await api.get_matchups("L", 1)
+        calls.clear()
+        with pytest.raises(SleeperUnavailable):
+            await api.get_matchups("L", 1)
+    
+    asyncio.run(run())
+    assert api.breaker.is_open
+    assert calls == []
+
+def test_half_open_circuit_lets_one_trial_call_through():
+    breaker = CircuitBreaker(threshold=2, cooldown=0.05)
+    breaker.record_failure()
+    breaker.record_failure()
+    with pytest.raises(SleeperUnavailable):
+        breaker.check()
+    
+    time.sleep(0.06)
+    breaker.check()  # the trial call
+    with pytest.raises(SleeperUnavailable):
+        breaker.check()  # concurrent callers still fail fast
+    
+    # A failed trial reopens the circuit at once
+    breaker.record_failure()
+    assert breaker.is_open
+    
+    time.sleep(0.06)
+    breaker.check()
+    breaker.record_success()
+    breaker.check()
+    breaker.check()
+    assert breaker.failures == 0
+
+def test_failed_player_refresh_serves_the_stale_index(tmp_path):
+    def handler(request):
+        return httpx.Response(503)
+    
+    db = PlayerDatabase(cache_dir=str(tmp_path), ttl=60)
+    db.players = {'1': PlayerInfo('A B', 'QB', 'KC')}
+    db.fetched_at = 0.0  # long past the TTL
+    assert asyncio.run(db.get(make_api(handler))) == {'1': PlayerInfo('A B', 'QB', 'KC')}
+    
+    # Without an index to fall back on the failure surfaces
+    with pytest.raises(SleeperUnavailable):
+        asyncio.run(PlayerDatabase(cache_dir=str(tmp_path)).get(make_api(handler)))
+
+def test_ingest_keeps_week_order_within_the_concurrency_limit():
+    weeks, concurrency = 6, 3
+    in_flight, peak = 0, 0
+    
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        week = int(request.url.path.rsplit('/', 1)[1])
+        # Earlier weeks answer last
+        await asyncio.sleep(0.002 * (weeks - week))
+        in_flight -= 1
+        if '/matchups/' in request.url.path:
+            return httpx.Response(200, json=[{'roster_id': 1, 'matchup_id': 1, 'players': [f"p{week}"],
+                                              'starters': [f"p{week}"], 'points': week}])
+        return httpx.Response(200, json={f"p{week}": {'pts_ppr': week}})
+    
+    rosters = [{'roster_id': 1, 'owner_id': 'u1', 'players': [], 'starters': []}]
+    all_matchups, all_rosters, all_player_stats = asyncio.run(ingest_weeks(
+        make_api(handler), "L", "2023", weeks, concurrency=concurrency, rosters=rosters))
+    
+    assert [matchups[0]['points'] for matchups in all_matchups] == list(range(1, weeks + 1))
+    assert [week_rosters[0]['players'] for week_rosters in all_rosters] == [[f"p{w}"] for w in range(1, weeks + 1)]
+    assert [stats.value(f"p{w}", 'pts_ppr') for w, stats in enumerate(all_player_stats, 1)] == list(range(1, weeks + 1))
+    assert peak == concurrency
+
+if __name__ == "__main__":
+    test_retries_throttled_requests()
+    test_exhausted_retries_raise_instead_of_returning_empty()
+    test_circuit_opens_after_repeated_failures()
+    test_half_open_circuit_lets_one_trial_call_through()
+    test_ingest_keeps_week_order_within_the_concurrency_limit()
+    print("✅ All Sleeper client tests passed")
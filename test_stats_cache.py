@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared weekly player stats cache (no network needed)
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+import main
+from fake_sleeper import FakeSleeper, generate_league
+
+class StatsPayloads:
+    """Sleeper stand-in that serves the given /stats payloads in order"""
+
+    def __init__(self, *payloads):
+        self.payloads = list(payloads)
+        self.calls = 0
+
+    async def get_player_stats(self, week, season):
+        self.calls += 1
+        return self.payloads.pop(0)
+
+@pytest.fixture
+def fake():
+    fake = FakeSleeper([generate_league(teams=4, weeks=2, seed=9)])
+    return fake, main.SleeperAPI(base_url=FakeSleeper.BASE_URL, client=fake.client())
+
+def test_completed_weeks_are_served_from_disk(fake, tmp_path):
+    fake, api = fake
+    cache = main.PlayerStatsCache(cache_dir=str(tmp_path))
+    stats = asyncio.run(cache.get(api, "2023", 1, complete=True))
+    assert len(stats) > 0
+    assert os.path.exists(os.path.join(cache.cache_dir, "2023_1.npz"))
+
+    # A new process reads the .npz instead of refetching
+    restarted = main.PlayerStatsCache(cache_dir=str(tmp_path), ttl=0)
+    loaded = asyncio.run(restarted.get(api, "2023", 1, complete=True))
+    assert fake.requests.count("/v1/stats/nfl/regular/2023/1") == 1
+    assert loaded.player_ids == stats.player_ids and (loaded.values == stats.values).all()
+
+def test_in_progress_week_is_refetched_after_ttl(fake, tmp_path):
+    fake, api = fake
+    cache = main.PlayerStatsCache(cache_dir=str(tmp_path), ttl=60)
+    asyncio.run(cache.get(api, "2023", 2, complete=False))
+    asyncio.run(cache.get(api, "2023", 2, complete=False))
+    assert fake.requests.count("/v1/stats/nfl/regular/2023/2") == 1
+    # The in-progress week is never written to disk
+    assert not os.path.exists(os.path.join(cache.cache_dir, "2023_2.npz"))
+
+    cache.ttl = 0
+    time.sleep(0.01)
+    asyncio.run(cache.get(api, "2023", 2, complete=False))
+    assert fake.requests.count("/v1/stats/nfl/regular/2023/2") == 2
+
+def test_empty_payloads_are_not_pinned(tmp_path):
+    api = StatsPayloads({}, {'1000': {'pts_ppr': 12.5}})
+    cache = main.PlayerStatsCache(cache_dir=str(tmp_path))
+
+    assert len(asyncio.run(cache.get(api, "2023", 1, complete=True))) == 0
+    assert not os.path.exists(os.path.join(cache.cache_dir, "2023_1.npz"))
+    # The next request retries instead of serving the empty week
+    stats = asyncio.run(cache.get(api, "2023", 1, complete=True))
+    assert api.calls == 2 and stats.value('1000', 'pts_ppr') == 12.5
+    assert os.path.exists(os.path.join(cache.cache_dir, "2023_1.npz"))
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
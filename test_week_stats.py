@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Tests for the packed weekly stats used by the analysis
+"""
+
+from main import WeekStats
+
+PAYLOAD = {
+    '1001': {'pts_ppr': 21.5, 'pass_yd': 280, 'pass_td': 2, 'gp': 1},
+    '1002': {'pts_ppr': 9.3, 'rec': 4, 'rec_yd': 53},
+    '1003': {'pts_ppr': 0.0},
+    'bad': None,
+}
+
+def test_projection_keeps_rostered_players_and_requested_fields():
+    stats = WeekStats.from_payload(PAYLOAD).project({'1002', '1003', '9999'}, ('pts_ppr', 'rec', 'fgm'))
+    
+    assert len(stats) == 2
+    assert '1001' not in stats and '9999' not in stats
+    assert stats.values.shape == (2, 3)
+    assert stats['1002'] == {'pts_ppr': 9.3, 'rec': 4.0, 'fgm': 0.0}
+    assert stats.get('1001') is None
+    assert stats.value('1003', 'pts_ppr') == 0.0
+
+def test_round_trips_through_disk(tmp_path):
+    stats = WeekStats.from_payload(PAYLOAD)
+    path = str(tmp_path / "2023_1.npz")
+    stats.save(path)
+    loaded = WeekStats.load(path)
+    
+    assert loaded.player_ids == ['1001', '1002', '1003']
+    assert loaded['1001'] == stats['1001']
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_projection_keeps_rostered_players_and_requested_fields()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_round_trips_through_disk(pathlib.Path(tmp))
+    print("✅ All week stats tests passed")